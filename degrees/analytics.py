@@ -0,0 +1,174 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import csr
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Whole-graph statistics for the degrees dataset."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--hub", default="Kevin Bacon",
+                        help="name or person id to measure separation from")
+    parser.add_argument("--samples", type=int, default=32,
+                        help="number of sampled sources for path statistics")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    graph = degrees.graph
+    if graph is None:
+        graph = csr.Graph.from_data(degrees.people, degrees.movies)
+    print("Data loaded.")
+
+    start = time.perf_counter()
+    labels = components(graph)
+    sizes = np.bincount(labels)
+    print(f"Connected components: {len(sizes)}, "
+          f"largest has {sizes.max()} of {len(labels)} people "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    hub = hub_index(graph, args.hub)
+    if hub is None:
+        sys.exit(f"{args.hub}: person not found.")
+    distances = separation(graph, hub)
+    print(f"Degrees of separation from {args.hub}:")
+    for depth, count in enumerate(distribution(distances)):
+        if count:
+            print(f"  {depth}: {count}")
+    print(f"  not connected: {int(np.count_nonzero(distances < 0))}")
+
+    start = time.perf_counter()
+    stats = path_statistics(graph, args.samples, np.random.default_rng(args.seed))
+    print(f"Approximate diameter: {stats['diameter']} "
+          f"(lower bound from {args.samples} sampled sources)")
+    print(f"Average path length: {stats['average']:.3f} "
+          f"+/- {stats['stderr']:.3f} ({time.perf_counter() - start:.2f}s)")
+
+
+def hub_index(graph, label):
+    """
+    Returns the person index for a person id or name, preferring the
+    best-connected person when a name is ambiguous.
+    """
+    person = graph.person_index(label)
+    if person is not None:
+        return person
+    people = graph.people_named(label)
+    if len(people) == 0:
+        return None
+    return int(people[np.argmax(np.diff(graph.person_indptr)[people])])
+
+
+def separation(graph, source):
+    """
+    Returns an array with the degrees of separation of every person
+    from the person index `source`, or -1 for people not connected.
+    """
+    distances = np.full(len(graph.person_ids), -1, dtype=np.int32)
+    distances[source] = 0
+    search = csr.Search(graph, source)
+    while not search.done():
+        reached = search.step()
+        distances[reached] = search.depth
+    return distances
+
+
+def distribution(distances):
+    """
+    Returns the number of people at each degree of separation.
+    """
+    return np.bincount(distances[distances >= 0])
+
+
+def components(graph):
+    """
+    Returns the connected component label of every person index,
+    numbered from 0. People who starred in no movie are components of
+    their own and are labelled last, all at once.
+    """
+    labels = np.full(len(graph.person_ids), -1, dtype=np.int32)
+    isolated = np.flatnonzero(np.diff(graph.person_indptr) == 0)
+    labels[isolated] = len(isolated)
+
+    # One search is reused for every component: people and movies it
+    # has already reached belong to earlier components and are skipped
+    search = None
+    count = 0
+    unlabelled = 0
+    while True:
+        unlabelled = next_unlabelled(labels, unlabelled)
+        if unlabelled is None:
+            labels[isolated] = count + np.arange(len(isolated), dtype=np.int32)
+            return labels
+        if search is None:
+            search = csr.Search(graph, unlabelled)
+        else:
+            search.restart(unlabelled)
+        labels[unlabelled] = count
+        while not search.done():
+            labels[search.step()] = count
+        count += 1
+
+
+def next_unlabelled(labels, start):
+    """
+    Returns the first index from `start` onwards with no label, or None.
+    """
+    remaining = np.flatnonzero(labels[start:] < 0)
+    if len(remaining) == 0:
+        return None
+    return start + int(remaining[0])
+
+
+def path_statistics(graph, samples, rng):
+    """
+    Estimates the diameter and average path length between connected
+    people from `samples` breadth-first searches, each rooted at a
+    random person who starred in at least one movie.
+
+    Each search measures exact distances to every person it reaches;
+    the sampled eccentricities give a lower bound on the diameter. The
+    average path length is the total distance over the total number of
+    reached pairs across the sampled sources, so each pair counts once
+    however large its component, with a delta-method standard error
+    for that ratio.
+    """
+    candidates = np.flatnonzero(np.diff(graph.person_indptr) > 0)
+    if len(candidates) == 0:
+        return {"diameter": 0, "average": 0.0, "stderr": 0.0}
+    sources = rng.choice(candidates, size=min(samples, len(candidates)), replace=False)
+
+    diameter = 0
+    totals = np.zeros(len(sources))
+    pairs = np.zeros(len(sources))
+    for i, source in enumerate(sources):
+        histogram = distribution(separation(graph, source))
+        diameter = max(diameter, len(histogram) - 1)
+        totals[i] = np.dot(np.arange(1, len(histogram)), histogram[1:])
+        pairs[i] = histogram[1:].sum()
+
+    if not pairs.any():
+        return {"diameter": int(diameter), "average": 0.0, "stderr": 0.0}
+    average = totals.sum() / pairs.sum()
+    stderr = 0.0
+    if len(sources) > 1:
+        # Sources are drawn without replacement, hence the finite population correction
+        residuals = totals - average * pairs
+        variance = residuals.var(ddof=1) / len(sources) * (1 - len(sources) / len(candidates))
+        stderr = np.sqrt(variance) / pairs.mean()
+    return {
+        "diameter": int(diameter),
+        "average": float(average),
+        "stderr": float(stderr),
+    }
+
+
+if __name__ == "__main__":
+    main()
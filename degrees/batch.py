@@ -0,0 +1,167 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+
+import csr
+import degrees
+
+# The graph shared read-only with forked workers
+graph = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees of separation queries as JSON lines."
+    )
+    parser.add_argument("pairs", help="CSV file of source,target names or ids")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="write results here instead of stdout")
+    parser.add_argument("--cache", type=int, metavar="MB",
+                        help="answer in this process from a cache of search trees "
+                             "of up to MB mebibytes, shared with degrees.tree_cache")
+    args = parser.parse_args()
+
+    global graph
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    graph = degrees.graph
+    if graph is None:
+        graph = csr.Graph.from_data(degrees.people, degrees.movies)
+    print("Data loaded.", file=sys.stderr)
+
+    with open(args.pairs, encoding="utf-8", newline="") as f:
+        queries = read_queries(csv.reader(f))
+
+    cache = None
+    if args.cache is not None:
+        cache = degrees.tree_cache
+        cache.max_bytes = args.cache * 2 ** 20
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in run(queries, args.workers, cache):
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if cache is not None:
+        print(f"Search tree cache: {cache.stats()}", file=sys.stderr)
+
+
+def read_queries(rows):
+    """
+    Returns a list of (source, target) labels from `rows`,
+    skipping blank rows and an optional source,target header.
+    """
+    queries = []
+    for row in rows:
+        if not row or not any(field.strip() for field in row):
+            continue
+        if len(row) != 2:
+            sys.exit(f"Expected a source and target, got {row}")
+        source, target = (field.strip() for field in row)
+        if not queries and (source.lower(), target.lower()) == ("source", "target"):
+            continue
+        queries.append((source, target))
+    return queries
+
+
+def resolve(label):
+    """
+    Returns the person_id for a label that is either a person_id or an
+    unambiguous name, or raises LookupError explaining why not.
+    """
+    if label in degrees.people:
+        return label
+    person_ids = degrees.names.get(label.lower(), set())
+    if len(person_ids) == 0:
+        raise LookupError("person not found")
+    if len(person_ids) > 1:
+        raise LookupError(f"ambiguous name: {sorted(person_ids)}")
+    return next(iter(person_ids))
+
+
+def group(queries):
+    """
+    Groups queries by source person index, so that one search from
+    each source answers all of its targets.
+
+    Returns the groups as (source index, [(query, target index)])
+    pairs and the results of queries that failed to resolve.
+    """
+    groups = {}
+    failed = []
+    for source, target in queries:
+        try:
+            source_index = graph.person_index(resolve(source))
+            target_index = graph.person_index(resolve(target))
+        except LookupError as e:
+            failed.append({"source": source, "target": target, "error": str(e)})
+            continue
+        groups.setdefault(source_index, []).append(((source, target), target_index))
+    return list(groups.items()), failed
+
+
+def run(queries, workers, cache=None):
+    """
+    Yields one result dictionary per query, in the order they are
+    answered.
+
+    If a `search.TreeCache` is given, queries are answered in this
+    process from the cached search tree of each source, built by
+    `degrees.search_tree`, so the cache carries over between calls and
+    can be shared with `degrees.shortest_path`.
+    """
+    groups, failed = group(queries)
+    yield from failed
+    if workers <= 1 or cache is not None:
+        for item in groups:
+            yield from answer(item, cache)
+        return
+
+    # Forked workers inherit `graph`, so only the query groups are pickled
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        for results in pool.imap_unordered(answer_all, groups):
+            yield from results
+
+
+def answer_all(item):
+    return list(answer(item))
+
+
+def answer(item, cache=None):
+    """
+    Yields the results for every target of one source, growing a
+    single breadth-first search until all targets are reached, or
+    walking the source's complete tree from `cache`.
+    """
+    source, targets = item
+    if cache is not None:
+        tree = cache.tree(csr.decode(graph.person_ids[source]), degrees.search_tree)
+    else:
+        search = csr.Search(graph, source)
+        remaining = {target for _, target in targets if target != source}
+        while remaining and not search.done():
+            search.step()
+            remaining = {t for t in remaining if search.person_movie[t] < 0}
+    for (source_label, target_label), target in targets:
+        result = {"source": source_label, "target": target_label}
+        if target == source:
+            path = []
+        elif cache is not None:
+            path = tree.path_to(csr.decode(graph.person_ids[target]))
+        elif search.person_movie[target] < 0:
+            path = None
+        else:
+            path = graph.path_to(search, target)
+        result["degrees"] = None if path is None else len(path)
+        result["path"] = path
+        yield result
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import multiprocessing
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+import csr
+import degrees
+from util import Node, StackFrontier, QueueFrontier
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [directory] [pairs]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    n = int(sys.argv[2]) if len(sys.argv) == 3 else 20
+
+    for streaming in (False, True):
+        label = "streaming" if streaming else "dictionary"
+        print(f"Peak RSS loading with the {label} loader: "
+              f"{megabytes(peak_rss(directory, streaming))}")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    degrees.load_data(directory, use_snapshot=False)
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s, "
+          f"{megabytes(tracemalloc.get_traced_memory()[0])} as dictionaries.")
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    graph = csr.Graph.from_data(degrees.people, degrees.movies)
+    print(f"CSR graph built in {time.perf_counter() - start:.2f}s, "
+          f"{megabytes(graph.nbytes)} as arrays.")
+
+    pairs = sample_pairs(n)
+    compare("frontier", legacy_shortest_path, degrees.shortest_path, pairs)
+    compare("bidirectional", degrees.shortest_path, bidirectional, pairs)
+    compare("csr", degrees.shortest_path, graph.shortest_path, pairs)
+
+
+def sample_pairs(n, seed=0):
+    """
+    Returns `n` random (source, target) pairs of distinct people
+    who have starred in at least one movie.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(
+        person_id for person_id, person in degrees.people.items()
+        if person["movies"]
+    )
+    pairs = []
+    while len(pairs) < n and len(person_ids) > 1:
+        source, target = rng.sample(person_ids, 2)
+        pairs.append((source, target))
+    return pairs
+
+
+def compare(label, baseline, candidate, pairs):
+    """
+    Times `baseline` and `candidate` on every pair, checks that they
+    agree on the degrees of separation and prints a summary.
+    """
+    baseline_time, baseline_lengths = timed(baseline, pairs)
+    candidate_time, candidate_lengths = timed(candidate, pairs)
+    if baseline_lengths != candidate_lengths:
+        sys.exit(f"{label}: path lengths disagree.")
+    speedup = baseline_time / candidate_time if candidate_time else float("inf")
+    print(f"{label}: {len(pairs)} queries, "
+          f"baseline {baseline_time:.3f}s, candidate {candidate_time:.3f}s, "
+          f"speedup {speedup:.1f}x")
+
+
+def timed(function, pairs):
+    """
+    Returns the total time taken to answer `pairs` with `function`
+    and the list of path lengths (None when not connected).
+    """
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = function(source, target)
+        lengths.append(None if path is None else len(path))
+    return time.perf_counter() - start, lengths
+
+
+def bidirectional(source, target):
+    return degrees.shortest_path(source, target, bidirectional=True)
+
+
+def peak_rss(directory, streaming):
+    """
+    Returns the peak resident set size, in bytes, of a fresh process
+    that loads `directory` with the dictionary or streaming loader.
+    """
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(load_peak_rss, (directory, streaming))
+
+
+def load_peak_rss(directory, streaming):
+    degrees.load_data(directory, use_snapshot=False, streaming=streaming)
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def megabytes(n):
+    return f"{n / 2 ** 20:.1f} MiB"
+
+
+def legacy_shortest_path(source, target):
+    """
+    The original list-backed frontier search, kept as the benchmark
+    baseline.
+    """
+    queue = QueueFrontier()
+    start = Node(source, None, None)
+    visited = StackFrontier()
+    queue.add(start)
+    while not queue.empty():
+        current_node = queue.remove()
+        visited.add(current_node)
+        neighbors = degrees.neighbors_for_person(current_node.state)
+        for n in neighbors:
+            if n[1] == target:
+                return convert_frontier_to_path(visited) + [(n[0], n[1])]
+            elif not visited.contains_state(n[1]):
+                queue.add(Node(n[1], current_node.state, n[0]))
+
+
+def convert_frontier_to_path(visited):
+    path = list()
+    prev_node = visited.remove()
+    while prev_node.parent is not None:
+        path.insert(0, (prev_node.action, prev_node.state))
+        for nd in visited.frontier:
+            if nd.state == prev_node.parent:
+                prev_node = nd
+                break
+        else:
+            return path
+    return path
+
+
+if __name__ == "__main__":
+    main()
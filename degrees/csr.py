@@ -0,0 +1,544 @@
+import csv
+import itertools
+import os
+import sys
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class Graph():
+    """
+    The people/movies star graph stored as two compressed sparse row
+    (CSR) adjacency structures over dense integer indices.
+
+    People and movies are sorted by their IMDB id, so the position of
+    an id in `person_ids` or `movie_ids` is its index, and an id can be
+    interned with a binary search instead of a dictionary.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_indptr, person_movies, movie_indptr, movie_people,
+                 name_keys, name_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+
+        # Movies of person i are person_movies[person_indptr[i]:person_indptr[i + 1]]
+        self.person_indptr = person_indptr
+        self.person_movies = person_movies
+
+        # Stars of movie j are movie_people[movie_indptr[j]:movie_indptr[j + 1]]
+        self.movie_indptr = movie_indptr
+        self.movie_people = movie_people
+
+        # Lower-cased names in sorted order, and the person index of each
+        self.name_keys = name_keys
+        self.name_people = name_people
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Build a graph from the `people` and `movies` dictionaries
+        filled in by `degrees.load_data`. `load_data` records a star's
+        movie before checking that the movie exists, so movies missing
+        from `movies` are skipped, as in `from_csv`.
+        """
+        person_keys = sorted(people, key=str.encode)
+        movie_keys = sorted(movies, key=str.encode)
+        person_ids = encode(person_keys)
+        movie_ids = encode(movie_keys)
+
+        stars = [
+            (person_id, movie_id)
+            for person_id in person_keys
+            for movie_id in people[person_id]["movies"]
+            if movie_id in movies
+        ]
+        return cls.build(
+            person_ids,
+            encode(people[p]["name"] for p in person_keys),
+            encode(people[p]["birth"] for p in person_keys),
+            encode(people[p]["name"].lower() for p in person_keys),
+            movie_ids,
+            encode(movies[m]["title"] for m in movie_keys),
+            encode(movies[m]["year"] for m in movie_keys),
+            lookup(person_ids, encode(p for p, _ in stars)),
+            lookup(movie_ids, encode(m for _, m in stars))
+        )
+
+    @classmethod
+    def from_csv(cls, directory, chunk_size=65536):
+        """
+        Build a graph straight from the CSV files in `directory`,
+        without the intermediate dictionaries of `degrees.load_data`.
+
+        Rows are read `chunk_size` at a time by column position and
+        each chunk is packed into byte string arrays, so the only
+        per-row Python objects kept are the interned ids mapping to
+        indices. Rows of stars.csv naming unknown people or movies
+        are skipped, and repeated rows are kept once.
+        """
+        person_index = {}
+        people = read_table(
+            os.path.join(directory, "people.csv"),
+            ("id", "name", "birth"), person_index, chunk_size, lower=1
+        )
+        movie_index = {}
+        movies = read_table(
+            os.path.join(directory, "movies.csv"),
+            ("id", "title", "year"), movie_index, chunk_size
+        )
+
+        edges_person = array("i")
+        edges_movie = array("i")
+        with open(os.path.join(directory, "stars.csv"), encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            person_column, movie_column = column_positions(next(reader), ("person_id", "movie_id"))
+            for rows in chunks(reader, chunk_size):
+                for row in rows:
+                    person = person_index.get(row[person_column])
+                    movie = movie_index.get(row[movie_column])
+                    if person is not None and movie is not None:
+                        edges_person.append(person)
+                        edges_movie.append(movie)
+        del person_index, movie_index
+
+        # Indices were handed out in file order; renumber them in id order
+        person_order, person_rank = sort_ranks(people[0])
+        movie_order, movie_rank = sort_ranks(movies[0])
+        edges_person = person_rank[np.frombuffer(edges_person, dtype=np.int32)]
+        edges_movie = movie_rank[np.frombuffer(edges_movie, dtype=np.int32)]
+        edges = np.unique(edges_person.astype(np.int64) * len(movie_order) + edges_movie)
+
+        return cls.build(
+            *(column[person_order] for column in people),
+            *(column[movie_order] for column in movies),
+            (edges // max(len(movie_order), 1)).astype(np.int32),
+            (edges % max(len(movie_order), 1)).astype(np.int32)
+        )
+
+    @classmethod
+    def build(cls, person_ids, person_names, person_births, person_lowered,
+              movie_ids, movie_titles, movie_years, edges_person, edges_movie):
+        """
+        Build a graph from id-sorted people and movies columns and the
+        (person index, movie index) pair of every star.
+        """
+        person_indptr, person_movies = to_csr(edges_person, edges_movie, len(person_ids))
+        movie_indptr, movie_people = to_csr(edges_movie, edges_person, len(movie_ids))
+        name_people = np.argsort(person_lowered, kind="stable").astype(np.int32)
+        return cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_indptr, person_movies, movie_indptr, movie_people,
+            person_lowered[name_people], name_people
+        )
+
+    @property
+    def nbytes(self):
+        """
+        Total size in bytes of the arrays backing the graph.
+        """
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def arrays(self):
+        """
+        Returns a dictionary of every array backing the graph,
+        keyed by attribute name.
+        """
+        return {
+            name: getattr(self, name) for name in (
+                "person_ids", "person_names", "person_births",
+                "movie_ids", "movie_titles", "movie_years",
+                "person_indptr", "person_movies",
+                "movie_indptr", "movie_people",
+                "name_keys", "name_people",
+            )
+        }
+
+    def person_index(self, person_id):
+        """
+        Returns the index of an IMDB person id, or None if unknown.
+        """
+        return find(self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the index of an IMDB movie id, or None if unknown.
+        """
+        return find(self.movie_ids, movie_id)
+
+    def people_named(self, name):
+        """
+        Returns the array of person indices whose lower-cased name
+        is exactly `name.lower()`.
+        """
+        key = name.lower().encode()
+        start = np.searchsorted(self.name_keys, key, side="left")
+        end = np.searchsorted(self.name_keys, key, side="right")
+        return self.name_people[start:end]
+
+    def movies_of(self, person):
+        """
+        Returns the array of movie indices a person index starred in.
+        """
+        return self.person_movies[self.person_indptr[person]:self.person_indptr[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the array of person indices who starred in a movie index.
+        """
+        return self.movie_people[self.movie_indptr[movie]:self.movie_indptr[movie + 1]]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        person = self.person_index(person_id)
+        neighbors = set()
+        if person is None:
+            return neighbors
+        for movie in self.movies_of(person):
+            movie_id = decode(self.movie_ids[movie])
+            for star in self.stars_of(movie):
+                neighbors.add((movie_id, decode(self.person_ids[star])))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        source = self.person_index(source)
+        target = self.person_index(target)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return []
+        search = Search(self, source)
+        while not search.done():
+            search.step()
+            if search.person_movie[target] >= 0:
+                return self.path_to(search, target)
+        return None
+
+    def tree(self, source):
+        """
+        Returns the complete search `Tree` rooted at an IMDB person id,
+        raising KeyError if the id is unknown.
+        """
+        index = self.person_index(source)
+        if index is None:
+            raise KeyError(source)
+        search = Search(self, index)
+        while not search.done():
+            search.step()
+        return Tree(search)
+
+    def path_to(self, search, person):
+        """
+        Returns the list of (movie_id, person_id) pairs leading from the
+        source of a finished or running `search` to a person index.
+        """
+        path = []
+        while person != search.source:
+            movie = search.person_movie[person]
+            path.append((decode(self.movie_ids[movie]), decode(self.person_ids[person])))
+            person = search.movie_person[movie]
+        path.reverse()
+        return path
+
+
+class PeopleView(Mapping):
+    """
+    Read-only view of a `Graph` shaped like `degrees.people`, building
+    each person's dictionary only when it is looked up.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            "name": decode(graph.person_names[person]),
+            "birth": decode(graph.person_births[person]),
+            "movies": {decode(graph.movie_ids[m]) for m in graph.movies_of(person)}
+        }
+
+    def __contains__(self, person_id):
+        return self.graph.person_index(person_id) is not None
+
+    def __iter__(self):
+        return (decode(person_id) for person_id in self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only view of a `Graph` shaped like `degrees.movies`.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": decode(graph.movie_titles[movie]),
+            "year": decode(graph.movie_years[movie]),
+            "stars": {decode(graph.person_ids[p]) for p in graph.stars_of(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return self.graph.movie_index(movie_id) is not None
+
+    def __iter__(self):
+        return (decode(movie_id) for movie_id in self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Read-only view of a `Graph` shaped like `degrees.names`, mapping
+    lower-cased names to sets of person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        graph = self.graph
+        people = graph.people_named(name)
+        if len(people) == 0:
+            raise KeyError(name)
+        return {decode(graph.person_ids[p]) for p in people}
+
+    def __iter__(self):
+        return (decode(name) for name in np.unique(self.graph.name_keys))
+
+    def __len__(self):
+        return len(np.unique(self.graph.name_keys))
+
+
+class Tree():
+    """
+    A complete `Search`, answering paths from its source to any person id.
+    """
+
+    def __init__(self, search):
+        self.search = search
+
+    @property
+    def nbytes(self):
+        return self.search.person_movie.nbytes + self.search.movie_person.nbytes
+
+    def path_to(self, target):
+        """
+        Returns the list of (movie_id, person_id) pairs leading from the
+        source to `target`, or None if `target` is not reachable.
+        """
+        graph = self.search.graph
+        target = graph.person_index(target)
+        if target is None or self.search.person_movie[target] < 0:
+            return None
+        return graph.path_to(self.search, target)
+
+
+class Search():
+    """
+    A level-synchronous breadth-first search over a `Graph`, where each
+    step expands the whole frontier with array operations.
+
+    `person_movie[i]` is the movie through which person i was reached
+    (-1 while unreached) and `movie_person[j]` is the person through
+    whom movie j was reached, so the two arrays form the parent map.
+    """
+
+    def __init__(self, graph, source):
+        self.graph = graph
+        self.source = source
+        self.person_movie = np.full(len(graph.person_ids), -1, dtype=np.int32)
+        self.movie_person = np.full(len(graph.movie_ids), -1, dtype=np.int32)
+        # Mark the source as reached without giving it a parent movie
+        self.person_movie[source] = np.iinfo(np.int32).max
+        self.frontier = np.array([source], dtype=np.int32)
+        self.depth = 0
+
+    def restart(self, source):
+        """
+        Continues searching from a new, unreached `source`, keeping
+        every person and movie already reached. Used to sweep connected
+        components without reallocating the parent arrays.
+        """
+        self.source = source
+        self.person_movie[source] = np.iinfo(np.int32).max
+        self.frontier = np.array([source], dtype=np.int32)
+        self.depth = 0
+
+    def done(self):
+        return len(self.frontier) == 0
+
+    def step(self):
+        """
+        Expands the frontier by one degree of separation and returns
+        the newly reached person indices.
+        """
+        graph = self.graph
+
+        # Movies reached for the first time through the frontier
+        movies, via = gather(graph.person_indptr, graph.person_movies, self.frontier)
+        movies = claim(self.movie_person, movies, via)
+
+        # People reached for the first time through those movies
+        people, via = gather(graph.movie_indptr, graph.movie_people, movies)
+        people = claim(self.person_movie, people, via)
+
+        self.frontier = people
+        self.depth += 1
+        return people
+
+
+def gather(indptr, indices, rows):
+    """
+    Concatenates the CSR rows `rows` and returns the column indices
+    together with the row each one came from.
+    """
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    owners = np.repeat(rows, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return indices[np.repeat(starts, counts) + offsets], owners
+
+
+def claim(parents, items, via):
+    """
+    Sets `parents[item]` to the matching entry of `via` for every item
+    not reached yet (parent < 0), and returns those items without
+    duplicates.
+    """
+    fresh = parents[items] < 0
+    items, via = items[fresh], via[fresh]
+
+    # Tag each occurrence with a distinct negative marker; the
+    # occurrence whose marker survives is the one that claims the item
+    marker = -2 - np.arange(len(items), dtype=np.int32)
+    parents[items] = marker
+    keep = parents[items] == marker
+    items = items[keep]
+    parents[items] = via[keep]
+    return items
+
+
+def read_table(filename, names, index, chunk_size, lower=None):
+    """
+    Reads the `names` columns of a CSV file, adding each row's id (the
+    first column) to `index` in file order. Rows repeating an id are
+    dropped. If `lower` is a column position, a lower-cased copy of that
+    column is appended to the result.
+
+    Returns a list of byte string arrays, one per column.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        positions = column_positions(next(reader), names)
+        packed = [[] for _ in range(len(positions) + (lower is not None))]
+        for rows in chunks(reader, chunk_size):
+            kept = []
+            for row in rows:
+                key = sys.intern(row[positions[0]])
+                if key not in index:
+                    index[key] = len(index)
+                    kept.append(row)
+            for column, position in zip(packed, positions):
+                column.append(encode(row[position] for row in kept))
+            if lower is not None:
+                packed[-1].append(encode(row[positions[lower]].lower() for row in kept))
+    return [np.concatenate(column) if column else encode([]) for column in packed]
+
+
+def column_positions(header, names):
+    """
+    Returns the position of every column in `names` within a CSV header.
+    """
+    return [header.index(name) for name in names]
+
+
+def chunks(rows, size):
+    """
+    Yields successive lists of at most `size` rows.
+    """
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def sort_ranks(keys):
+    """
+    Returns the order that sorts `keys` and the rank of every key in it.
+    """
+    order = np.argsort(keys, kind="stable")
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    return order, rank
+
+
+def to_csr(rows, columns, n_rows):
+    """
+    Returns the (indptr, indices) arrays of the CSR structure holding
+    the (row, column) pairs, with each row's columns sorted.
+    """
+    order = np.lexsort((columns, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, columns[order].astype(np.int32)
+
+
+def lookup(keys, values):
+    """
+    Returns the index of every entry of `values` in the sorted array `keys`.
+    """
+    return np.searchsorted(keys, values).astype(np.int32)
+
+
+def find(keys, value):
+    """
+    Returns the index of `value` in the sorted array `keys`, or None.
+    """
+    value = value.encode()
+    i = int(np.searchsorted(keys, value))
+    if i < len(keys) and keys[i] == value:
+        return i
+    return None
+
+
+def encode(strings):
+    """
+    Returns a fixed-width byte string array of UTF-8 encoded strings.
+    """
+    return np.array([s.encode() for s in strings], dtype=np.bytes_)
+
+
+def decode(value):
+    return value.decode()
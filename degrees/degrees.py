@@ -1,7 +1,13 @@
+import argparse
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import numpy as np
+
+import csr
+import nameindex
+import search
+import snapshot
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +18,38 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# The csr.Graph backing the three views above when loaded from a snapshot
+graph = None
+
+# Prefix and fuzzy index over the keys of `names`, built by the interactive
+# and server entry points after loading and otherwise on first use
+name_index = None
+
+# Search trees of recently queried people, shared by every entry point
+tree_cache = search.TreeCache()
 
-def load_data(directory):
+
+def load_data(directory, use_snapshot=True, streaming=False):
     """
     Load data from CSV files into memory.
+
+    If `directory` has a snapshot newer than its CSV files (see
+    snapshot.py), memory-map it instead of parsing the CSV files.
+    If `streaming` is true, parse the CSV files straight into a
+    `csr.Graph`, which needs far less memory than the dictionaries.
     """
+    global names, people, movies, graph, name_index
+    if use_snapshot and snapshot.is_fresh(directory):
+        use_graph(snapshot.load(directory))
+        name_index = snapshot.load_name_index(directory)
+        return
+    if streaming:
+        use_graph(csr.Graph.from_csv(directory))
+        return
+
+    names, people, movies, graph, name_index = {}, {}, {}, None, None
+    tree_cache.clear()
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -52,27 +85,74 @@ def load_data(directory):
                 pass
 
 
+def use_graph(loaded):
+    """
+    Serve `names`, `people` and `movies` from a `csr.Graph`.
+    """
+    global names, people, movies, graph, name_index
+    graph = loaded
+    names = csr.NamesView(graph)
+    people = csr.PeopleView(graph)
+    movies = csr.MoviesView(graph)
+    name_index = None
+    tree_cache.clear()
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two people."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument(
+        "--bidirectional", action="store_true",
+        help="search from both people at once"
+    )
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="load the CSV files into compact arrays"
+    )
+    parser.add_argument(
+        "--repeat", action="store_true",
+        help="keep answering queries until end of input"
+    )
+    args = parser.parse_args()
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(args.directory, streaming=args.streaming)
+    # Build the name index now rather than at the first misspelled name
+    get_name_index()
     print("Data loaded.")
 
+    if not args.repeat:
+        query(sys.exit, bidirectional=args.bidirectional)
+        return
+
+    # Keep answering until end of input, reusing cached search trees
+    while True:
+        try:
+            query(print, bidirectional=args.bidirectional, cache=tree_cache)
+        except EOFError:
+            break
+    print(f"\nSearch tree cache: {tree_cache.stats()}")
+
+
+def query(fail, bidirectional=False, cache=None):
+    """
+    Reads two names, then prints the degrees of separation between them.
+    `fail` is called with a message when the query cannot be answered.
+    """
     source = person_id_for_name(input("Name: "))
     if source is None:
-        sys.exit("Person not found.")
+        return fail("Person not found.")
     target = person_id_for_name(input("Name: "))
     if target is None:
-        sys.exit("Person not found.")
-    
+        return fail("Person not found.")
+
     if(source == target):
-        sys.exit("Source and Target are the same person")
+        return fail("Source and Target are the same person")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=bidirectional, cache=cache)
 
     if path is None:
         print("Not connected.")
@@ -87,37 +167,36 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
-    queue =QueueFrontier()
-    # BFS search 
-    start = Node(source, None, None)
-    visited = StackFrontier()
-    queue.add(start) 
-    while not queue.empty():   
-        current_node = queue.remove()
-        visited.add(current_node)
-        neighbors = neighbors_for_person(current_node.state) 
-        for n in neighbors:
-            if(n[1] == target): 
-                path = convert_frontier_to_path(visited) + [(n[0], n[1])] 
-                print(path)
-                return path 
-            else:
-                if(not visited.contains_state(n[1])):
-                    queue.add(Node(n[1], current_node.state, n[0]))                   
-
-def convert_frontier_to_path(visited: StackFrontier):
-    path = list() 
-    prev_node = visited.remove()  
-    while prev_node.parent != None: 
-        path.insert(0,(prev_node.action, prev_node.state)) 
-        for nd in visited.frontier:
-            if nd.state == prev_node.parent:
-                prev_node = nd
-                break 
-        else:
-            return path
-    return path
+def shortest_path(source, target, bidirectional=False, cache=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    If `bidirectional` is true, search from both people at once.
+    Otherwise, if a `search.TreeCache` is given, walk the cached search
+    tree of the source, building it first if needed.
+    If no possible path, returns None.
+    """
+    if bidirectional:
+        return search.bidirectional_path(source, target, neighbors_for_person)
+    if cache is not None:
+        # Like `csr.Graph.shortest_path`, unknown people have no path
+        if graph is not None and graph.person_index(source) is None:
+            return None
+        return cache.tree(source, search_tree).path_to(target)
+    if graph is not None:
+        return graph.shortest_path(source, target)
+    return search.shortest_path(source, target, neighbors_for_person)
+
+
+def search_tree(source):
+    """
+    Returns the complete breadth-first search tree rooted at `source`.
+    """
+    if graph is not None:
+        return graph.tree(source)
+    return search.tree(source, neighbors_for_person)
+
 
 def person_id_for_name(name):
     """
@@ -126,7 +205,7 @@ def person_id_for_name(name):
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
-        return None
+        return suggest(name)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -145,11 +224,54 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def suggest(name):
+    """
+    Offers the closest known names to a name that matched nobody,
+    returning the IMDB id for the one chosen, or None.
+    """
+    candidates = [candidate for candidate, _ in find_names(name, limit=5)]
+    if not candidates:
+        return None
+    print(f"No match for '{name}'. Did you mean:")
+    for i, candidate in enumerate(candidates, 1):
+        print(f"{i}: {candidate}")
+    choice = input("Intended name (number): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(candidates):
+        return person_id_for_name(candidates[int(choice) - 1])
+    return None
+
+
+def find_names(query, max_distance=2, limit=10):
+    """
+    Returns up to `limit` (name, distance) pairs of lower-cased names
+    close to `query`: typos within `max_distance` edits ranked by
+    distance, then names starting with `query` (distance None).
+    """
+    return get_name_index().search(query, max_distance, limit)
+
+
+def get_name_index():
+    """
+    Returns the `nameindex.NameIndex` over the loaded names,
+    building it the first time it is needed.
+    """
+    global name_index
+    if name_index is None:
+        if graph is not None:
+            keys = np.unique(graph.name_keys)
+        else:
+            keys = np.array(sorted(name.encode() for name in names), dtype=np.bytes_)
+        name_index = nameindex.NameIndex.build(keys)
+    return name_index
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
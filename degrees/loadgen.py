@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import statistics
+import time
+from urllib.parse import urlencode
+
+import batch
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure latency and throughput of a degrees server."
+    )
+    parser.add_argument("pairs", help="CSV file of source,target names or ids")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--socket", help="connect to this Unix socket instead")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bidirectional", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.pairs, encoding="utf-8", newline="") as f:
+        queries = batch.read_queries(csv.reader(f))
+    latencies, errors, elapsed = asyncio.run(run(args, queries))
+    report(latencies, errors, elapsed)
+
+
+async def run(args, queries):
+    """
+    Sends `args.requests` path queries over `args.concurrency`
+    keep-alive connections, cycling through `queries`.
+
+    Returns the latency of every successful request, the number of
+    failed requests and the total elapsed time.
+    """
+    pending = itertools.islice(itertools.cycle(queries), args.requests)
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        if args.socket:
+            reader, writer = await asyncio.open_unix_connection(args.socket)
+        else:
+            reader, writer = await asyncio.open_connection(args.host, args.port)
+        try:
+            for source, target in pending:
+                params = {"source": source, "target": target}
+                if args.bidirectional:
+                    params["bidirectional"] = "1"
+                start = time.perf_counter()
+                status = await request(reader, writer, f"/path?{urlencode(params)}")
+                if status == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def request(reader, writer, target):
+    """
+    Sends one GET request and returns the response status,
+    after reading and decoding the JSON body.
+    """
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: degrees\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    json.loads(await reader.readexactly(length))
+    return status
+
+
+def report(latencies, errors, elapsed):
+    print(f"{len(latencies)} requests succeeded, {errors} failed "
+          f"in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} requests/s)")
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(f"p50 {cuts[49] * 1000:.2f} ms, p99 {cuts[98] * 1000:.2f} ms, "
+              f"max {max(latencies) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
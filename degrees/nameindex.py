@@ -0,0 +1,233 @@
+from array import array
+
+import numpy as np
+
+# Names are padded so that their first and last characters appear in
+# as many trigrams as the rest
+PADDING = "  "
+
+
+class NameIndex():
+    """
+    Prefix and typo-tolerant lookup over a sorted array of unique,
+    lower-cased, UTF-8 encoded names.
+
+    Fuzzy matching uses a trigram inverted index stored in CSR form:
+    the names containing `grams[g]` are `postings[indptr[g]:indptr[g + 1]]`,
+    in ascending order. One edit changes at most three trigrams, so a
+    name within k edits of the query contains at least one of any 3k + 1
+    of the query's distinct trigrams, and all but at most 3k of them.
+    Candidates are gathered from the postings of the 3k + 2 rarest query
+    trigrams only, keeping names in at least two of them, then checked
+    against the other postings by binary search, so no query touches an
+    array as long as the list of names.
+    """
+
+    def __init__(self, keys, grams, indptr, postings):
+        self.keys = keys
+        self.grams = grams
+        self.indptr = indptr
+        self.postings = postings
+        self.lengths = None
+
+    @classmethod
+    def build(cls, keys):
+        """
+        Build the index for the sorted array of encoded names `keys`.
+        """
+        vocabulary = {}
+        gram_ids = array("i")
+        name_ids = array("i")
+        for i, key in enumerate(keys):
+            for gram in set(trigrams(key.decode())):
+                gram_ids.append(vocabulary.setdefault(gram, len(vocabulary)))
+                name_ids.append(i)
+
+        # Renumber gram ids in sorted gram order so grams can be binary searched
+        grams = np.array([gram.encode() for gram in vocabulary], dtype=np.bytes_)
+        order = np.argsort(grams, kind="stable")
+        rank = np.empty(len(order), dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        gram_ids = rank[np.frombuffer(gram_ids, dtype=np.int32)]
+        name_ids = np.frombuffer(name_ids, dtype=np.int32)
+
+        by_gram = np.argsort(gram_ids, kind="stable")
+        indptr = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_ids, minlength=len(grams)), out=indptr[1:])
+        return cls(keys, grams[order], indptr, name_ids[by_gram])
+
+    def arrays(self):
+        return {
+            "keys": self.keys,
+            "grams": self.grams,
+            "indptr": self.indptr,
+            "postings": self.postings,
+        }
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` names starting with `prefix`, in sorted order.
+        """
+        lo, hi = self.prefix_range(prefix.lower())
+        return [decode(key) for key in self.keys[lo:min(hi, lo + limit)]]
+
+    def prefix_range(self, prefix):
+        """
+        Returns the slice of `keys` holding every name that starts with
+        `prefix`. No UTF-8 encoded string contains the byte 0xff, so it
+        sorts after every continuation of the prefix.
+        """
+        key = prefix.encode()
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        hi = int(np.searchsorted(self.keys, key + b"\xff", side="left"))
+        return lo, hi
+
+    def fuzzy(self, query, max_distance=2, limit=10):
+        """
+        Returns up to `limit` (name, distance) pairs for names within
+        `max_distance` edits of `query`, closest first. Short queries
+        are allowed fewer edits (see `edits_allowed`), so that "tom"
+        does not match every name of up to four letters.
+        """
+        query = query.lower()
+        max_distance = edits_allowed(query, max_distance)
+        candidates = self.candidates(query, max_distance)
+        matches = []
+        for i in candidates:
+            name = decode(self.keys[i])
+            distance = edit_distance(query, name, max_distance)
+            if distance <= max_distance:
+                matches.append((name, distance))
+        matches.sort(key=lambda match: (match[1], abs(len(match[0]) - len(query)), match[0]))
+        return matches[:limit]
+
+    def search(self, query, max_distance=2, limit=10):
+        """
+        Returns up to `limit` (name, distance) candidates for `query`:
+        exact and fuzzy matches by distance, then names that merely
+        start with `query` (reported with distance None).
+        """
+        matches = self.fuzzy(query, max_distance, limit)
+        seen = {name for name, _ in matches}
+        for name in self.prefix(query, limit):
+            if len(matches) >= limit:
+                break
+            if name not in seen:
+                matches.append((name, None))
+        return matches
+
+    def candidates(self, query, max_distance):
+        """
+        Returns the indices of names that may be within `max_distance`
+        edits of `query`, which needs at least 3 * max_distance + 1
+        distinct trigrams (see `edits_allowed`). Exact matches are found
+        by binary search over the names instead.
+        """
+        if self.lengths is None:
+            self.lengths = character_lengths(self.keys)
+        if max_distance == 0:
+            lo, hi = self.prefix_range(query)
+            return np.arange(lo, lo + (lo < hi and self.keys[lo] == query.encode()))
+
+        postings = []
+        for gram in set(trigrams(query)):
+            key = gram.encode()
+            g = int(np.searchsorted(self.grams, key))
+            if g < len(self.grams) and self.grams[g] == key:
+                postings.append(self.postings[self.indptr[g]:self.indptr[g + 1]])
+            else:
+                postings.append(self.postings[:0])
+        postings.sort(key=len)
+        allowed = 3 * max_distance
+        if len(postings) <= allowed:
+            raise ValueError(f"{query!r} is too short for {max_distance} edits")
+
+        # A match misses at most 3k of any r trigrams, so it is in at least
+        # r - 3k of the r rarest postings; sorting them together counts how many
+        rarest = min(len(postings), allowed + 2)
+        merged = np.sort(np.concatenate(postings[:rarest]))
+        runs = np.flatnonzero(np.concatenate(([True], merged[1:] != merged[:-1], [True])))
+        misses = rarest - (runs[1:] - runs[:-1])
+        kept = misses <= allowed
+        found, misses = merged[runs[:-1][kept]], misses[kept]
+
+        # Names whose lengths differ by more than k differ by more than k edits
+        near = abs(self.lengths[found] - len(query)) <= max_distance
+        found, misses = found[near], misses[near]
+
+        # Then drop names as soon as they miss more than 3k trigrams
+        for posting in postings[rarest:]:
+            if len(found) == 0:
+                break
+            if len(posting) == 0:
+                misses += 1
+            else:
+                at = np.minimum(posting.searchsorted(found), len(posting) - 1)
+                misses += posting[at] != found
+            kept = misses <= allowed
+            found, misses = found[kept], misses[kept]
+        return found
+
+
+def edits_allowed(query, max_distance):
+    """
+    Returns the number of edits a fuzzy match of `query` may have: at
+    most `max_distance`, at most one per three characters, and few
+    enough that the query has 3k + 1 distinct trigrams to find
+    candidates by. Queries of up to three characters therefore only
+    match exactly, and `NameIndex.search` falls back to names starting
+    with them.
+    """
+    k = min(max_distance, (len(query) - 1) // 3, (len(set(trigrams(query))) - 1) // 3)
+    return max(0, k)
+
+
+def character_lengths(keys):
+    """
+    Returns the number of characters of each UTF-8 encoded name, counting
+    the bytes that are neither padding nor continuation bytes.
+    """
+    data = np.ascontiguousarray(keys)
+    width = data.dtype.itemsize
+    if len(data) == 0 or width == 0:
+        return np.zeros(len(data), dtype=np.int16)
+    octets = data.view(np.uint8).reshape(len(data), width)
+    counts = np.count_nonzero((octets != 0) & ((octets & 0xC0) != 0x80), axis=1)
+    return counts.astype(np.int16)
+
+
+def trigrams(name):
+    padded = PADDING + name + PADDING
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, bound):
+    """
+    Returns the Levenshtein distance between `a` and `b` if it is at
+    most `bound`, or `bound + 1` otherwise. Only the diagonal band of
+    width 2 * bound + 1 of the dynamic programming table is filled in.
+    """
+    over = bound + 1
+    if abs(len(a) - len(b)) > bound:
+        return over
+    previous = [j if j <= bound else over for j in range(len(b) + 1)]
+    for i, x in enumerate(a, 1):
+        lo = max(1, i - bound)
+        hi = min(len(b), i + bound)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= bound else over
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (x != b[j - 1])
+            if previous[j] < cost:
+                cost = previous[j] + 1
+            if current[j - 1] < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+        if min(current[lo - 1:hi + 1]) > bound:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+def decode(value):
+    return value.decode()
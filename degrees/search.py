@@ -0,0 +1,211 @@
+import sys
+from collections import OrderedDict, deque
+
+
+def shortest_path(source, target, neighbors):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, expanding each person
+    with `neighbors(person_id)`.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Every discovered person maps to the (movie_id, person_id) step
+    # that reached it, so the explored set and the parent pointers
+    # are the same dictionary.
+    parents = {source: None}
+    frontier = deque([source])
+    while frontier:
+        person_id = frontier.popleft()
+        for movie_id, neighbor_id in neighbors(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            if neighbor_id == target:
+                return path_to(parents, target)
+            frontier.append(neighbor_id)
+    return None
+
+
+def tree(source, neighbors):
+    """
+    Returns the complete breadth-first search `Tree` rooted at `source`.
+    """
+    parents = {source: None}
+    frontier = deque([source])
+    while frontier:
+        person_id = frontier.popleft()
+        for movie_id, neighbor_id in neighbors(person_id):
+            if neighbor_id not in parents:
+                parents[neighbor_id] = (movie_id, person_id)
+                frontier.append(neighbor_id)
+    return Tree(parents)
+
+
+class Tree():
+    """
+    A complete search tree, stored as the parent map of every person
+    reachable from its root.
+    """
+
+    def __init__(self, parents):
+        self.parents = parents
+
+    @property
+    def nbytes(self):
+        """
+        Approximate memory used by the parent map.
+        """
+        return sys.getsizeof(self.parents) + len(self.parents) * sys.getsizeof((None, None))
+
+    def path_to(self, target):
+        """
+        Returns the list of (movie_id, person_id) pairs leading from the
+        root to `target`, or None if `target` is not reachable.
+        """
+        if target not in self.parents:
+            return None
+        return path_to(self.parents, target)
+
+
+class TreeCache():
+    """
+    Least recently used cache of search trees keyed by their source,
+    holding at most `max_bytes` of trees (as reported by `tree.nbytes`).
+    """
+
+    def __init__(self, max_bytes=512 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def tree(self, source, build):
+        """
+        Returns the cached tree for `source`, calling `build(source)`
+        and caching the result on a miss.
+        """
+        if source in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(source)
+            return self.trees[source]
+        self.misses += 1
+        tree = build(source)
+        self.trees[source] = tree
+        self.nbytes += tree.nbytes
+
+        # Evict the least recently used trees, but always keep the newest
+        while self.nbytes > self.max_bytes and len(self.trees) > 1:
+            _, evicted = self.trees.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return tree
+
+    def clear(self):
+        self.trees.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """
+        Returns a dictionary of hit/miss counts and current usage.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "trees": len(self.trees),
+            "bytes": self.nbytes,
+        }
+
+
+def path_to(parents, target):
+    """
+    Returns the list of (movie_id, person_id) pairs leading from the
+    root of a `parents` map to `target`, following one parent pointer
+    per hop.
+    """
+    path = []
+    person_id = target
+    while parents[person_id] is not None:
+        movie_id, parent_id = parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+    return path
+
+
+def bidirectional_path(source, target, neighbors):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both
+    ends at once and always expanding the smaller frontier by
+    one full level.
+
+    Co-starring is symmetric, so the same `neighbors` function
+    expands both searches. If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand(
+                forward_frontier, forward, forward_depth,
+                backward_depth, neighbors
+            )
+        else:
+            backward_frontier, meeting = expand(
+                backward_frontier, backward, backward_depth,
+                forward_depth, neighbors
+            )
+        if meeting is not None:
+            return path_to(forward, meeting) + path_from(backward, meeting)
+    return None
+
+
+def expand(frontier, parents, depth, other_depth, neighbors):
+    """
+    Expands every person in `frontier` by one level, recording parent
+    pointers and depths. Returns the next frontier and the person
+    where this search met the other one with the shortest combined
+    path, or None if they have not met yet.
+    """
+    next_frontier = []
+    meeting = None
+    best = None
+    for person_id in frontier:
+        for movie_id, neighbor_id in neighbors(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            depth[neighbor_id] = depth[person_id] + 1
+            next_frontier.append(neighbor_id)
+            if neighbor_id in other_depth:
+                length = depth[neighbor_id] + other_depth[neighbor_id]
+                if best is None or length < best:
+                    meeting, best = neighbor_id, length
+    return next_frontier, meeting
+
+
+def path_from(parents, person_id):
+    """
+    Returns the list of (movie_id, person_id) pairs leading from
+    `person_id` back to the root of a `parents` map.
+    """
+    path = []
+    while parents[person_id] is not None:
+        movie_id, parent_id = parents[person_id]
+        path.append((movie_id, parent_id))
+        person_id = parent_id
+    return path
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import batch
+import degrees
+
+# Longest request line or header line accepted, in bytes
+MAX_LINE = 8192
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees of separation queries over HTTP."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--socket", help="listen on this Unix socket instead")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--cache", type=int, metavar="MB",
+                        help="answer path queries from caches of complete search "
+                             "trees of up to MB mebibytes in total, split across workers")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    # Build the name index now rather than on the event loop at the first /names
+    degrees.get_name_index()
+    print("Data loaded.")
+    if args.cache is not None:
+        # Set before the workers are forked, so each inherits its share
+        degrees.tree_cache.max_bytes = args.cache * 2 ** 20 // max(args.workers, 1)
+    asyncio.run(serve(args))
+
+
+async def serve(args):
+    # Forked workers inherit the loaded data; only ids and paths are pickled
+    executor = ProcessPoolExecutor(
+        args.workers, mp_context=multiprocessing.get_context("fork")
+    )
+    handler = Handler(executor, cached=args.cache is not None)
+    if args.socket:
+        server = await asyncio.start_unix_server(handler.connection, path=args.socket)
+        print(f"Listening on {args.socket}")
+    else:
+        server = await asyncio.start_server(handler.connection, args.host, args.port)
+        print(f"Listening on http://{args.host}:{args.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+class Handler():
+    """
+    Answers HTTP/1.1 GET requests on keep-alive connections:
+
+        /path?source=NAME_OR_ID&target=NAME_OR_ID[&bidirectional=1]
+        /names?q=QUERY[&limit=N]
+
+    Name resolution runs on the event loop; searches run in `executor`,
+    walking each worker's cached search trees if `cached` is true.
+    Other methods get 405 and malformed requests get 400, after which
+    the connection is closed.
+    """
+
+    def __init__(self, executor, cached=False):
+        self.executor = executor
+        self.cached = cached
+
+    async def connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except ValueError as e:
+                    writer.write(encode_response(400, {"error": str(e)}, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                if method == "GET":
+                    status, body = await self.respond(target)
+                else:
+                    # A request body would follow, so the connection cannot be reused
+                    status, body = 405, {"error": f"method {method} not allowed"}
+                    keep_alive = False
+                writer.write(encode_response(status, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, target):
+        """
+        Returns the HTTP status and JSON-serializable body for a
+        request target.
+        """
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == "/path":
+            return await self.path(query)
+        if url.path == "/names":
+            return names(query)
+        return 404, {"error": "not found"}
+
+    async def path(self, query):
+        try:
+            source = batch.resolve(query["source"])
+            target = batch.resolve(query["target"])
+        except KeyError as e:
+            return 400, {"error": f"missing parameter {e}"}
+        except LookupError as e:
+            return 404, {"error": str(e)}
+        bidirectional = query.get("bidirectional") in ("1", "true")
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(
+            self.executor, find_path, source, target, bidirectional, self.cached
+        )
+        return 200, {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path,
+        }
+
+
+def names(query):
+    if "q" not in query:
+        return 400, {"error": "missing parameter 'q'"}
+    try:
+        limit = int(query.get("limit", 10))
+    except ValueError:
+        return 400, {"error": "limit must be an integer"}
+    return 200, {"names": degrees.find_names(query["q"], limit=limit)}
+
+
+def find_path(source, target, bidirectional, cached):
+    """
+    Runs in a worker process. Each worker keeps its own tree cache;
+    without one, the search stops as soon as it reaches the target.
+    """
+    if bidirectional:
+        return degrees.shortest_path(source, target, bidirectional=True)
+    if cached:
+        return degrees.shortest_path(source, target, cache=degrees.tree_cache)
+    return degrees.shortest_path(source, target)
+
+
+async def read_request(reader):
+    """
+    Reads one request head and returns its method, target and
+    lower-cased headers, or None once the client has closed the
+    connection. Raises ValueError if the head is malformed.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    if len(line) > MAX_LINE:
+        raise ValueError("request line too long")
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ValueError("malformed request line")
+    method, target, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if len(line) > MAX_LINE:
+            raise ValueError("header line too long")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+def encode_response(status, body, keep_alive):
+    reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+    content = json.dumps(body).encode()
+    head = f"HTTP/1.1 {status} {reasons[status]}\r\n"
+    if status == 405:
+        head += "Allow: GET\r\n"
+    head += (
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + content
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+import csr
+import nameindex
+
+# Bump whenever the set or layout of snapshot arrays changes
+VERSION = 2
+
+# File name prefix of the name index arrays
+NAME_INDEX = "name_index."
+
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+
+def path(directory):
+    """
+    Returns the snapshot directory kept next to the CSV files.
+    """
+    return os.path.join(directory, "snapshot")
+
+
+def is_fresh(directory):
+    """
+    Returns True if `directory` has a snapshot of the current version
+    that is newer than every CSV file it was built from.
+    """
+    manifest = os.path.join(path(directory), "manifest.json")
+    try:
+        with open(manifest, encoding="utf-8") as f:
+            if json.load(f).get("version") != VERSION:
+                return False
+        built = os.path.getmtime(manifest)
+        return all(
+            os.path.getmtime(os.path.join(directory, source)) <= built
+            for source in SOURCES
+        )
+    except (OSError, ValueError):
+        return False
+
+
+def save(directory, graph, name_index=None):
+    """
+    Write `graph`, and optionally its `nameindex.NameIndex`, as a
+    snapshot of `directory`, one .npy file per array.
+    """
+    target = path(directory)
+    staging = target + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    arrays = graph.arrays()
+    if name_index is not None:
+        arrays.update({
+            NAME_INDEX + name: array for name, array in name_index.arrays().items()
+        })
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), array)
+
+    # The manifest is written last, so its mtime dates the snapshot
+    with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION, "arrays": sorted(arrays)}, f)
+    shutil.rmtree(target, ignore_errors=True)
+    os.rename(staging, target)
+
+
+def load(directory):
+    """
+    Returns the `csr.Graph` stored in the snapshot of `directory`,
+    with every array memory-mapped read-only.
+    """
+    arrays = load_arrays(directory)
+    return csr.Graph(**{
+        name: array for name, array in arrays.items()
+        if not name.startswith(NAME_INDEX)
+    })
+
+
+def load_name_index(directory):
+    """
+    Returns the `nameindex.NameIndex` stored in the snapshot of
+    `directory`, or None if the snapshot was saved without one.
+    """
+    arrays = {
+        name[len(NAME_INDEX):]: array
+        for name, array in load_arrays(directory).items()
+        if name.startswith(NAME_INDEX)
+    }
+    return nameindex.NameIndex(**arrays) if arrays else None
+
+
+def load_arrays(directory):
+    """
+    Returns every array of the snapshot of `directory` by name,
+    memory-mapped read-only.
+    """
+    source = path(directory)
+    with open(os.path.join(source, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["version"] != VERSION:
+        raise ValueError(f"snapshot version {manifest['version']} is not {VERSION}")
+    return {
+        name: np.load(os.path.join(source, f"{name}.npy"), mmap_mode="r")
+        for name in manifest["arrays"]
+    }
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    import degrees
+
+    print("Loading data...")
+    start = time.perf_counter()
+    degrees.load_data(directory, use_snapshot=False, streaming=True)
+    save(directory, degrees.graph, degrees.get_name_index())
+    print(f"Snapshot written to {path(directory)} "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
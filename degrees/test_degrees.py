@@ -0,0 +1,314 @@
+import asyncio
+import csv
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import analytics
+import batch
+import csr
+import degrees
+import nameindex
+import search
+import server
+import snapshot
+
+
+def write_dataset(directory, n_people=60, n_movies=25, n_stars=90, seed=7):
+    rng = random.Random(seed)
+    with open(directory / "people.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(n_people):
+            writer.writerow([str(100 + i), f"Person {i}", str(1950 + i)])
+        writer.writerow(["999", "Person 0", "1999"])
+    with open(directory / "movies.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(n_movies):
+            writer.writerow([str(5000 + i), f"Movie {i}", str(1980 + i)])
+    with open(directory / "stars.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for _ in range(n_stars):
+            person = 100 + rng.randrange(n_people)
+            movie = 5000 + rng.randrange(n_movies)
+            writer.writerow([str(person), str(movie)])
+        writer.writerow(["1", "5000"])
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("small")
+    write_dataset(directory)
+    degrees.load_data(directory)
+    return directory
+
+
+def assert_valid_path(source, target, path):
+    person_id = source
+    for movie_id, next_id in path:
+        assert person_id in degrees.movies[movie_id]["stars"]
+        assert next_id in degrees.movies[movie_id]["stars"]
+        person_id = next_id
+    assert person_id == target
+
+
+def test_unknown_stars_are_skipped(dataset):
+    assert "1" not in degrees.people
+
+
+def test_bidirectional_matches_unidirectional(dataset):
+    person_ids = sorted(degrees.people)
+    for source in person_ids[:15]:
+        for target in person_ids:
+            if source == target:
+                continue
+            path = degrees.shortest_path(source, target)
+            other = degrees.shortest_path(source, target, bidirectional=True)
+            if path is None:
+                assert other is None
+                continue
+            assert len(other) == len(path)
+            assert_valid_path(source, target, path)
+            assert_valid_path(source, target, other)
+
+
+def test_csr_graph_matches_dictionaries(dataset):
+    graph = csr.Graph.from_data(degrees.people, degrees.movies)
+    person_ids = sorted(degrees.people)
+    for person_id in person_ids:
+        assert graph.neighbors_for_person(person_id) == degrees.neighbors_for_person(person_id)
+    for source in person_ids[:15]:
+        for target in person_ids:
+            path = degrees.shortest_path(source, target)
+            other = graph.shortest_path(source, target)
+            if path is None:
+                assert other is None
+                continue
+            assert len(other) == len(path)
+            assert_valid_path(source, target, other)
+
+
+def test_csr_graph_skips_stars_of_unknown_movies(dataset, tmp_path):
+    write_dataset(tmp_path)
+    with open(tmp_path / "stars.csv", "a", newline="") as f:
+        f.write("100,5003x\n101,9999\n")
+    try:
+        degrees.load_data(tmp_path, use_snapshot=False)
+        graph = csr.Graph.from_data(degrees.people, degrees.movies)
+        for person_id in ("100", "101"):
+            person = graph.person_index(person_id)
+            expected = degrees.people[person_id]["movies"] & degrees.movies.keys()
+            assert {graph.movie_ids[m].decode() for m in graph.movies_of(person)} == expected
+            for movie in graph.movies_of(person):
+                assert person in graph.stars_of(movie)
+        streamed = csr.Graph.from_csv(tmp_path)
+        assert np.array_equal(streamed.person_movies, graph.person_movies)
+        assert np.array_equal(streamed.movie_people, graph.movie_people)
+    finally:
+        degrees.load_data(dataset)
+
+
+def test_load_data_uses_fresh_snapshot(dataset, tmp_path):
+    write_dataset(tmp_path)
+    degrees.load_data(tmp_path)
+    expected = {
+        person_id: degrees.shortest_path("100", person_id)
+        for person_id in degrees.people
+    }
+    snapshot.save(tmp_path, csr.Graph.from_data(degrees.people, degrees.movies))
+    assert snapshot.is_fresh(tmp_path)
+    try:
+        degrees.load_data(tmp_path)
+        assert degrees.graph is not None
+        assert degrees.names["person 0"] == {"100", "999"}
+        assert degrees.people["101"]["name"] == "Person 1"
+        for person_id, path in expected.items():
+            other = degrees.shortest_path("100", person_id)
+            assert (other is None) == (path is None)
+            if path is not None:
+                assert len(other) == len(path)
+                assert_valid_path("100", person_id, other)
+        cache = search.TreeCache()
+        assert degrees.shortest_path("1", "100") is None
+        assert degrees.shortest_path("1", "100", cache=cache) is None
+        assert degrees.shortest_path("100", "1", cache=cache) is None
+        with pytest.raises(KeyError):
+            degrees.graph.tree("1")
+    finally:
+        degrees.load_data(dataset)
+
+
+def test_batch_answers_grouped_queries(dataset):
+    batch.graph = csr.Graph.from_data(degrees.people, degrees.movies)
+    person_ids = sorted(degrees.people)
+    queries = [(source, target) for source in person_ids[:3] for target in person_ids]
+    queries += [("Person 1", "Person 2"), ("Person 0", "100"), ("Nobody", "100")]
+    cache = search.TreeCache()
+    for workers, tree_cache in ((1, None), (2, None), (1, cache), (1, cache)):
+        results = {
+            (r["source"], r["target"]): r
+            for r in batch.run(queries, workers, tree_cache)
+        }
+        assert len(results) == len(queries)
+        assert "ambiguous" in results[("Person 0", "100")]["error"]
+        assert results[("Nobody", "100")]["error"] == "person not found"
+        path = degrees.shortest_path("101", "102")
+        assert results[("Person 1", "Person 2")]["degrees"] == (
+            None if path is None else len(path)
+        )
+        for source, target in queries[:-3]:
+            path = degrees.shortest_path(source, target)
+            result = results[(source, target)]
+            assert result["degrees"] == (None if path is None else len(path))
+            if path is not None:
+                assert_valid_path(source, target, result["path"])
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["hits"] == 3
+
+    # A cache filled by interactive queries serves batch queries too
+    shared = search.TreeCache()
+    degrees.shortest_path(person_ids[0], person_ids[1], cache=shared)
+    results = list(batch.run(queries[:len(person_ids)], 1, shared))
+    assert shared.stats()["hits"] == 1
+    for result in results:
+        path = degrees.shortest_path(result["source"], result["target"])
+        assert result["degrees"] == (None if path is None else len(path))
+
+
+def test_tree_cache_evicts_least_recently_used(dataset):
+    person_ids = sorted(degrees.people)
+    cache = search.TreeCache()
+    for source in person_ids[:5]:
+        for target in person_ids:
+            path = degrees.shortest_path(source, target)
+            other = degrees.shortest_path(source, target, cache=cache)
+            assert (other is None) == (path is None)
+            if path is not None:
+                assert len(other) == len(path)
+                assert_valid_path(source, target, other)
+    assert cache.stats()["misses"] == 5
+    assert cache.stats()["hits"] == 5 * len(person_ids) - 5
+
+    cache = search.TreeCache(max_bytes=1)
+    degrees.shortest_path(person_ids[0], person_ids[1], cache=cache)
+    degrees.shortest_path(person_ids[1], person_ids[0], cache=cache)
+    assert list(cache.trees) == [person_ids[1]]
+
+
+def test_analytics_agree_with_shortest_path(dataset):
+    graph = csr.Graph.from_data(degrees.people, degrees.movies)
+    labels = analytics.components(graph)
+    person_ids = [csr.decode(person_id) for person_id in graph.person_ids]
+    for source in range(5):
+        distances = analytics.separation(graph, source)
+        for target, person_id in enumerate(person_ids):
+            path = degrees.shortest_path(person_ids[source], person_id)
+            if path is None:
+                assert distances[target] == -1
+                assert labels[target] != labels[source]
+            else:
+                assert distances[target] == len(path)
+                assert labels[target] == labels[source]
+
+
+def test_average_path_length_weighs_every_connected_pair():
+    people, movies = {}, {}
+
+    def star(person_id, movie_id):
+        people.setdefault(person_id, {"name": person_id, "birth": "", "movies": set()})
+        movies.setdefault(movie_id, {"title": movie_id, "year": "", "stars": set()})
+        people[person_id]["movies"].add(movie_id)
+        movies[movie_id]["stars"].add(person_id)
+
+    # A chain of 40 people, then 40 separate pairs
+    for i in range(39):
+        star(f"c{i}", f"m{i}")
+        star(f"c{i + 1}", f"m{i}")
+    for i in range(40):
+        star(f"a{i}", f"p{i}")
+        star(f"b{i}", f"p{i}")
+    graph = csr.Graph.from_data(people, movies)
+    stats = analytics.path_statistics(graph, len(people), np.random.default_rng(0))
+    assert stats["average"] == pytest.approx((40 * 39 * 41 / 3 + 80) / (40 * 39 + 80))
+    assert stats["stderr"] == pytest.approx(0)
+    assert stats["diameter"] == 39
+    sampled = analytics.path_statistics(graph, 30, np.random.default_rng(0))
+    assert sampled["stderr"] > 0
+
+
+def test_find_names_ranks_typos_and_prefixes(dataset):
+    assert degrees.find_names("person 12", limit=1) == [("person 12", 0)]
+    assert degrees.find_names("persn 12", limit=1) == [("person 12", 1)]
+    assert ("person 21", 2) in degrees.find_names("prson 2", limit=20)
+    prefixes = [name for name, distance in degrees.find_names("person 5", max_distance=0, limit=20)
+                if distance is None]
+    assert prefixes and all(name.startswith("person 5") for name in prefixes)
+    assert degrees.find_names("zzzzzzzz") == []
+
+
+def test_fuzzy_matches_agree_with_edit_distance():
+    rng = random.Random(3)
+    names = {"".join(rng.choice("abc ") for _ in range(rng.randint(1, 9))) for _ in range(400)}
+    index = nameindex.NameIndex.build(np.array(sorted(n.encode() for n in names)))
+    for query in ["a", "ab", "abc", "abca", "cab ba", "bbacab", "aa cc bb"]:
+        k = nameindex.edits_allowed(query, 2)
+        expected = {n for n in names if nameindex.edit_distance(query, n, k) <= k}
+        assert {n for n, _ in index.fuzzy(query, limit=len(names))} == expected
+    assert nameindex.edits_allowed("tom", 2) == 0
+    assert nameindex.edits_allowed("tomas", 2) == 1
+
+
+def test_person_id_for_name_suggests_candidates(dataset, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt: "1")
+    assert degrees.person_id_for_name("Persn 12") == "112"
+
+
+def test_streaming_loader_matches_dictionaries(dataset):
+    expected = csr.Graph.from_data(degrees.people, degrees.movies)
+    loaded = csr.Graph.from_csv(dataset, chunk_size=7)
+    for name, array in expected.arrays().items():
+        assert np.array_equal(array, loaded.arrays()[name]), name
+
+
+def test_server_answers_path_and_name_requests(dataset):
+    async def respond(target, cached=False):
+        with ThreadPoolExecutor(1) as executor:
+            return await server.Handler(executor, cached).respond(target)
+
+    path = degrees.shortest_path("100", "101")
+    for cached in (False, True):
+        status, body = asyncio.run(respond("/path?source=100&target=Person+1", cached))
+        assert status == 200
+        assert body["degrees"] == (None if path is None else len(path))
+    status, body = asyncio.run(respond("/path?source=Person+0&target=101"))
+    assert status == 404 and "ambiguous" in body["error"]
+    status, body = asyncio.run(respond("/names?q=persn+12&limit=1"))
+    assert body == {"names": [("person 12", 1)]}
+    assert asyncio.run(respond("/nothing"))[0] == 404
+
+
+def test_server_rejects_other_methods_and_malformed_requests(dataset):
+    async def exchange(data):
+        with ThreadPoolExecutor(1) as executor:
+            handler = server.Handler(executor)
+            listener = await asyncio.start_server(handler.connection, "127.0.0.1", 0)
+            async with listener:
+                port = listener.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(data)
+                response = await reader.read()
+                writer.close()
+                return response
+
+    response = asyncio.run(exchange(b"POST /path HTTP/1.1\r\nContent-Length: 0\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 405 ") and b"Allow: GET" in response
+    response = asyncio.run(exchange(b"nonsense\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 400 ")
+    response = asyncio.run(exchange(b"GET /names?q=person+12&limit=1 HTTP/1.1\r\n"
+                                    b"Connection: close\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 200 ")
+    assert response.endswith(b'{"names": [["person 12", 0]]}')
@@ -0,0 +1,106 @@
+import argparse
+import time
+
+import elimination
+import junction
+import pedigree
+import pruned
+import vectorized
+from heredity import enumerate_probabilities
+
+METHODS = {
+    "enumerate": enumerate_probabilities,
+    "pruned": pruned.probabilities,
+    "vectorized": vectorized.probabilities,
+    "elimination": elimination.probabilities,
+    "junction": junction.probabilities,
+}
+
+# Largest families the exponential methods are run on
+LIMITS = {
+    "enumerate": 8,
+    "pruned": 12,
+    "vectorized": 14,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark heredity inference.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 4, 5, 6, 7],
+                        help="numbers of people in random family trees")
+    parser.add_argument("--generations", type=int, nargs="+",
+                        help="benchmark layered families of these depths instead, "
+                             "where cousins marry")
+    parser.add_argument("--couples", type=int, default=2,
+                        help="couples per generation of layered families")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--baseline", choices=METHODS, default="enumerate",
+                        help="method speedups are reported against")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.generations:
+        families = [
+            (f"{depth} generations", pedigree.layered_family(depth, args.couples, args.seed))
+            for depth in args.generations
+        ]
+    else:
+        families = [
+            ("", pedigree.random_family(size, args.seed)) for size in args.sizes
+        ]
+    print(f"Speedups are against {args.baseline}.")
+    for label, people in families:
+        label = f"{label}, " if label else ""
+        results = {}
+        times = {}
+        for method in args.methods:
+            if len(people) > LIMITS.get(method, len(people)):
+                continue
+            start = time.perf_counter()
+            results[method] = METHODS[method](people)
+            times[method] = time.perf_counter() - start
+        if not times:
+            print(f"{label}{len(people)} people: skipped, larger than every "
+                  f"selected method's limit")
+            continue
+        # The baseline is timed even when it is not one of the methods compared
+        baseline = args.baseline
+        if baseline not in args.methods and len(people) <= LIMITS.get(baseline, len(people)):
+            start = time.perf_counter()
+            METHODS[baseline](people)
+            times[baseline] = time.perf_counter() - start
+        report = ", ".join(
+            f"{method} {times[method]:.3f}s{speedup(times, method, baseline)}"
+            for method in times if method in results
+        )
+        print(f"{label}{len(people)} people: {report}, largest difference "
+              f"{largest_difference(results):.1e}")
+
+
+def speedup(times, method, baseline):
+    """
+    Returns the speedup of `method` over `baseline` for the report, or
+    a note that the baseline was not run.
+    """
+    if baseline not in times:
+        return f" (no {baseline} baseline)"
+    return f" ({times[baseline] / times[method]:.1f}x)"
+
+
+def largest_difference(results):
+    """
+    Returns the largest difference of any probability between the
+    `results` of different methods.
+    """
+    results = list(results.values())
+    return max((
+        abs(result[name][field][value] - results[0][name][field][value])
+        for result in results[1:]
+        for name in result
+        for field in result[name]
+        for value in result[name][field]
+    ), default=0)
+
+
+if __name__ == "__main__":
+    main()
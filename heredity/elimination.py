@@ -0,0 +1,158 @@
+import heapq
+import string
+
+import numpy as np
+
+import pedigree
+
+
+class Factor():
+    """
+    A table of non-negative values over the gene counts of the people
+    in `variables`, one table axis per person.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = table
+
+
+def family_factors(family):
+    """
+    Returns one factor per person of a `pedigree.Family`: their gene
+    prior or inheritance table, times the likelihood of their known trait.
+    """
+    prior = pedigree.prior()
+    inheritance = pedigree.inheritance()
+    factors = []
+    for i in range(len(family)):
+        evidence = family.evidence[i]
+        if family.mothers[i] < 0:
+            factors.append(Factor((i,), prior * evidence))
+        else:
+            factors.append(Factor(
+                (i, family.mothers[i], family.fathers[i]),
+                inheritance * evidence[:, None, None]
+            ))
+    return factors
+
+
+def multiply(factors):
+    """
+    Returns the product of `factors` as one factor.
+    """
+    variables = []
+    for factor in factors:
+        variables.extend(v for v in factor.variables if v not in variables)
+    letters = dict(zip(variables, string.ascii_letters))
+    operands = []
+    for factor in factors:
+        operands.append(factor.table)
+        operands.append([letters[v] for v in factor.variables])
+    subscripts = ",".join("".join(letters) for letters in operands[1::2])
+    table = np.einsum(
+        f"{subscripts}->{''.join(letters[v] for v in variables)}", *operands[::2]
+    )
+    return Factor(variables, table)
+
+
+def sum_out(factor, variable):
+    """
+    Returns `factor` with `variable` summed out, rescaled so its largest
+    value is 1: every marginal is normalized at the end, and rescaling
+    keeps products over hundreds of people from underflowing.
+    """
+    axis = factor.variables.index(variable)
+    table = factor.table.sum(axis=axis)
+    largest = table.max() if table.size else 0
+    if largest > 0:
+        table = table / largest
+    return Factor(factor.variables[:axis] + factor.variables[axis + 1:], table)
+
+
+def elimination_order(factors, n):
+    """
+    Returns an order in which to eliminate the `n` people, greedily
+    picking the person whose elimination adds the fewest new edges
+    between their neighbours (min-fill), breaking ties by fewest
+    neighbours. Scores are refreshed only for the neighbours of each
+    eliminated person.
+    """
+    neighbours = [set() for _ in range(n)]
+    for factor in factors:
+        for v in factor.variables:
+            neighbours[v].update(factor.variables)
+    for v in range(n):
+        neighbours[v].discard(v)
+
+    def score(v):
+        fill = sum(
+            1 for a in neighbours[v] for b in neighbours[v]
+            if a < b and b not in neighbours[a]
+        )
+        return (fill, len(neighbours[v]), v)
+
+    heap = [score(v) for v in range(n)]
+    heapq.heapify(heap)
+    current = {entry[2]: entry for entry in heap}
+    order = []
+    eliminated = set()
+    while heap:
+        entry = heapq.heappop(heap)
+        v = entry[2]
+        if v in eliminated or current[v] != entry:
+            continue
+        order.append(v)
+        eliminated.add(v)
+        for a in neighbours[v]:
+            neighbours[a].discard(v)
+            neighbours[a].update(neighbours[v] - {a})
+        for a in neighbours[v]:
+            current[a] = score(a)
+            heapq.heappush(heap, current[a])
+    return order
+
+
+def eliminate(factors, order, query):
+    """
+    Returns the normalized marginal of `query` by bucket elimination:
+    every factor waits in the bucket of its first variable in `order`,
+    and each bucket in turn is multiplied out, summed over its variable
+    and passed on to the bucket of the next. `query` is kept for last.
+    """
+    rank = {v: i for i, v in enumerate(order)}
+    rank[query] = len(order)
+    buckets = [[] for _ in range(len(order) + 1)]
+    for factor in factors:
+        buckets[min(rank[v] for v in factor.variables)].append(factor)
+    for i, variable in enumerate(order):
+        if variable == query or not buckets[i]:
+            continue
+        message = sum_out(multiply(buckets[i]), variable)
+        if message.variables:
+            buckets[min(rank[v] for v in message.variables)].append(message)
+    marginal = multiply(buckets[-1]).table
+    return marginal / marginal.sum()
+
+
+def gene_marginals(family):
+    """
+    Returns the (n x 3) array of every person's gene distribution
+    given the known traits, running one elimination per person with a
+    shared elimination order.
+    """
+    factors = family_factors(family)
+    order = elimination_order(factors, len(family))
+    genes = np.empty((len(family), len(pedigree.GENES)))
+    for person in range(len(family)):
+        genes[person] = eliminate(factors, order, person)
+    return genes
+
+
+def probabilities(people):
+    """
+    Return the `heredity.main` probabilities dictionary of every person
+    in `people`, computed exactly by variable elimination.
+    """
+    family = pedigree.Family(people)
+    return family.probabilities(gene_marginals(family))
@@ -1,7 +1,14 @@
+import argparse
 import csv
 import itertools
-import sys
 import math
+import sys
+
+import elimination
+import junction
+import pruned
+import sampling
+import vectorized
 
 PROBS = {
 
@@ -39,11 +46,69 @@ PROBS = {
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Compute gene and trait probabilities for a family."
+    )
+    parser.add_argument("data", help="CSV file with name, mother, father, trait")
+    parser.add_argument(
+        "--method",
+        choices=["enumerate", "pruned", "vectorized", "elimination", "junction",
+                 *sampling.SAMPLERS],
+        default="enumerate",
+        help="sum over every assignment, enumerate gene assignments "
+             "incrementally or as arrays, run variable elimination or "
+             "junction tree propagation, or estimate by likelihood "
+             "weighting or Gibbs sampling"
+    )
+    parser.add_argument("--samples", type=int, default=100000,
+                        help="number of samples for likelihood and gibbs")
+    parser.add_argument("--seed", type=int, help="random seed for likelihood and gibbs")
+    parser.add_argument("--budget", type=float,
+                        help="stop sampling after this many seconds")
+    args = parser.parse_args()
+    people = load_data(args.data)
+    report = None
+    if args.method in sampling.SAMPLERS:
+        try:
+            probabilities, report = sampling.probabilities(
+                people, args.method, samples=args.samples, seed=args.seed, budget=args.budget
+            )
+        except ValueError as e:
+            sys.exit(str(e))
+    elif args.method == "elimination":
+        probabilities = elimination.probabilities(people)
+    elif args.method == "junction":
+        probabilities = junction.probabilities(people)
+    elif args.method == "pruned":
+        probabilities = pruned.probabilities(people)
+    elif args.method == "vectorized":
+        probabilities = vectorized.probabilities(people)
+    else:
+        probabilities = enumerate_probabilities(people)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+    if report is not None:
+        print(f"Estimated from {report['samples']} samples in {report['seconds']:.2f}s, "
+              f"largest standard error {report['error']:.4f}")
+        if "effective" in report:
+            print(f"  Effective sample size: {report['effective']:.0f}")
+        if "rhat" in report:
+            print(f"  Largest potential scale reduction: {report['rhat']:.3f}")
 
-    # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
-    people = load_data(sys.argv[1])
+
+def enumerate_probabilities(people):
+    """
+    Return the gene and trait distribution of every person in `people`
+    by summing the joint probability of every assignment of genes and
+    traits consistent with the known traits.
+    """
 
     # Keep track of gene and trait probabilities for each person
     probabilities = {
@@ -84,15 +149,7 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
-
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -0,0 +1,106 @@
+import numpy as np
+
+import elimination
+import pedigree
+
+
+class JunctionTree():
+    """
+    A junction tree over the people of a `pedigree.Family`, built from
+    a greedy elimination order: eliminating person v forms the clique of
+    v and their neighbours at that point, whose parent is the clique of
+    the first of those neighbours to be eliminated. Each family factor
+    belongs to the clique of its first eliminated person.
+
+    Pedigrees with loops, such as marriages between cousins, only make
+    cliques larger; the cost is linear in the number of people and
+    exponential only in the largest clique.
+    """
+
+    def __init__(self, family):
+        self.factors = elimination.family_factors(family)
+        n = len(family)
+        self.order = elimination.elimination_order(self.factors, n)
+        rank = {v: i for i, v in enumerate(self.order)}
+
+        neighbours = [set() for _ in range(n)]
+        for factor in self.factors:
+            for v in factor.variables:
+                neighbours[v].update(factor.variables)
+        self.cliques = [None] * n
+        self.parents = [None] * n
+        self.children = [[] for _ in range(n)]
+        for v in self.order:
+            others = sorted(neighbours[v] - {v}, key=rank.get)
+            self.cliques[v] = (v, *others)
+            if others:
+                self.parents[v] = others[0]
+                self.children[others[0]].append(v)
+            for a in others:
+                neighbours[a].discard(v)
+                neighbours[a].update(others)
+
+        self.assigned = [[] for _ in range(n)]
+        for factor in self.factors:
+            self.assigned[min(factor.variables, key=rank.get)].append(factor)
+
+    def width(self):
+        """
+        Returns the number of people in the largest clique.
+        """
+        return max((len(clique) for clique in self.cliques), default=0)
+
+    def gene_marginals(self):
+        """
+        Returns the (n x 3) array of every person's gene distribution
+        given the known traits, passing messages up the tree in
+        elimination order and back down in reverse.
+        """
+        n = len(self.order)
+        up = [None] * n
+        for v in self.order:
+            bucket = self.assigned[v] + [up[c] for c in self.children[v]]
+            up[v] = project(elimination.multiply(bucket), self.cliques[v][1:])
+
+        down = [None] * n
+        genes = np.empty((n, len(pedigree.GENES)))
+        for v in reversed(self.order):
+            bucket = self.assigned[v] + [up[c] for c in self.children[v]]
+            if down[v] is not None:
+                bucket.append(down[v])
+            belief = elimination.multiply(bucket)
+            marginal = project(belief, (v,)).table
+            genes[v] = marginal / marginal.sum()
+
+            # Divide out each child's own message before sending it back
+            for c in self.children[v]:
+                inverse = elimination.Factor(up[c].variables, np.divide(
+                    1, up[c].table, out=np.zeros_like(up[c].table), where=up[c].table > 0
+                ))
+                down[c] = project(
+                    elimination.multiply([belief, inverse]), self.cliques[c][1:]
+                )
+        return genes
+
+
+def project(factor, variables):
+    """
+    Returns `factor` summed over everyone not in `variables`, rescaled
+    so its largest value is 1.
+    """
+    axes = tuple(i for i, v in enumerate(factor.variables) if v not in variables)
+    table = factor.table.sum(axis=axes) if axes else factor.table
+    largest = table.max() if table.size else 0
+    if largest > 0:
+        table = table / largest
+    kept = tuple(v for v in factor.variables if v in variables)
+    return elimination.Factor(kept, table)
+
+
+def probabilities(people):
+    """
+    Return the `heredity.main` probabilities dictionary of every person
+    in `people`, computed exactly on a junction tree.
+    """
+    family = pedigree.Family(people)
+    return family.probabilities(JunctionTree(family).gene_marginals())
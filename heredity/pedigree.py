@@ -0,0 +1,194 @@
+import random
+
+import numpy as np
+
+import heredity
+
+# Gene counts index the first axis of every table
+GENES = (0, 1, 2)
+
+
+class Family():
+    """
+    A family from `load_data` compiled to integer person indices, with
+    parents listed before their children.
+
+    `mothers[i]` and `fathers[i]` are the indices of person i's parents,
+    or -1 for people without parents in the data, and `evidence[i, g]`
+    is the probability of person i's known trait given g copies of the
+    gene (1 if the trait is unknown).
+    """
+
+    def __init__(self, people):
+        self.names = topological_order(people)
+        index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        self.mothers = np.full(n, -1, dtype=np.int64)
+        self.fathers = np.full(n, -1, dtype=np.int64)
+        self.traits = [people[name]["trait"] for name in self.names]
+        self.evidence = np.ones((n, len(GENES)))
+        traits = trait_table()
+        for i, name in enumerate(self.names):
+            mother, father = people[name]["mother"], people[name]["father"]
+            if (mother is None) != (father is None):
+                raise ValueError(f"{name} must have both parents or neither")
+            if mother is not None:
+                self.mothers[i] = index[mother]
+                self.fathers[i] = index[father]
+            if self.traits[i] is not None:
+                self.evidence[i] = traits[:, int(self.traits[i])]
+
+    def __len__(self):
+        return len(self.names)
+
+    def founders(self):
+        """
+        Returns a boolean array marking people without parents.
+        """
+        return self.mothers < 0
+
+    def probabilities(self, genes):
+        """
+        Returns the `main` probabilities dictionary for an (n x 3) array
+        of gene marginals, with trait marginals derived from them: a
+        known trait is certain, and an unknown one depends only on that
+        person's own genes.
+        """
+        traits = genes @ trait_table()
+        for i, trait in enumerate(self.traits):
+            if trait is not None:
+                traits[i] = [not trait, trait]
+        return {
+            name: {
+                "gene": {g: float(genes[i, g]) for g in (2, 1, 0)},
+                "trait": {True: float(traits[i, 1]), False: float(traits[i, 0])},
+            }
+            for i, name in enumerate(self.names)
+        }
+
+
+def topological_order(people):
+    """
+    Return the names in `people` ordered so that parents come before
+    their children, raising ValueError for unknown parents or cycles.
+    """
+    order = []
+    state = {}
+    for start in people:
+        stack = [(start, False)]
+        while stack:
+            name, expanded = stack.pop()
+            if expanded:
+                state[name] = "done"
+                order.append(name)
+                continue
+            if state.get(name) == "done":
+                continue
+            if state.get(name) == "open":
+                raise ValueError(f"{name} is their own ancestor")
+            state[name] = "open"
+            stack.append((name, True))
+            for parent in (people[name]["mother"], people[name]["father"]):
+                if parent is None:
+                    continue
+                if parent not in people:
+                    raise ValueError(f"unknown parent {parent} of {name}")
+                if state.get(parent) != "done":
+                    stack.append((parent, False))
+    return order
+
+
+def prior():
+    """
+    Returns the unconditional gene distribution of people without parents.
+    """
+    return np.array([heredity.PROBS["gene"][g] for g in GENES])
+
+
+def inheritance():
+    """
+    Returns the (3 x 3 x 3) table of P(child genes | mother's genes,
+    father's genes): each parent passes on the gene with probability
+    depending on their own copies, and passed genes may mutate.
+    """
+    mutation = heredity.PROBS["mutation"]
+    passes = np.array([mutation, 0.5, 1 - mutation])
+    table = np.empty((3, 3, 3))
+    table[2] = np.outer(passes, passes)
+    table[0] = np.outer(1 - passes, 1 - passes)
+    table[1] = 1 - table[0] - table[2]
+    return table
+
+
+def trait_table():
+    """
+    Returns the (3 x 2) table of P(trait | genes), indexed by gene count
+    and by trait as 0 for False and 1 for True.
+    """
+    return np.array([
+        [heredity.PROBS["trait"][g][False], heredity.PROBS["trait"][g][True]]
+        for g in GENES
+    ])
+
+
+def random_family(size, seed=None, observed=0.5):
+    """
+    Returns a random family of `size` people shaped like `load_data`
+    output. It grows from one couple: each child has a random existing
+    couple as parents and may later marry someone from outside the
+    family, so no one has two lines of descent. A fraction `observed` of people
+    have a known trait.
+    """
+    rng = random.Random(seed)
+    people = {}
+    couples = []
+    single = []
+
+    def add(mother=None, father=None):
+        name = f"Person{len(people)}"
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": rng.random() < 0.3 if rng.random() < observed else None,
+        }
+        return name
+
+    couples.append((add(), add()))
+    while len(people) < size:
+        if single and len(people) < size - 1 and rng.random() < 0.4:
+            # Someone from outside the family marries in
+            spouse = single.pop(rng.randrange(len(single)))
+            couples.append((spouse, add()) if rng.random() < 0.5 else (add(), spouse))
+        else:
+            single.append(add(*rng.choice(couples)))
+    return people
+
+
+def layered_family(generations, couples=2, seed=None, observed=0.5):
+    """
+    Returns a random family of `generations` generations shaped like
+    `load_data` output. The first generation is `couples` couples, each
+    couple has two children, and the children pair up at random into
+    the next generation's couples, so cousins and siblings marry and
+    genes reach people along several lines of descent.
+    """
+    rng = random.Random(seed)
+    people = {}
+
+    def add(mother=None, father=None):
+        name = f"Person{len(people)}"
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": rng.random() < 0.3 if rng.random() < observed else None,
+        }
+        return name
+
+    generation = [(add(), add()) for _ in range(couples)]
+    for _ in range(generations - 1):
+        children = [add(mother, father) for mother, father in generation for _ in range(2)]
+        rng.shuffle(children)
+        generation = list(zip(children[::2], children[1::2]))
+    return people
@@ -0,0 +1,69 @@
+import numpy as np
+
+import pedigree
+
+
+def gene_marginals(family):
+    """
+    Returns the (n x 3) array of every person's gene distribution
+    given the known traits, by enumerating every gene assignment.
+
+    Traits are not enumerated: a known trait only weighs its person's
+    genes by its likelihood, and an unknown one sums out. Genes are
+    assigned depth first in topological order, so every person's factor
+    depends only on people already assigned and the product of factors
+    so far is carried down instead of recomputed; changing one person's
+    genes only revisits the people after them. A branch whose product
+    is zero is pruned along with every assignment below it.
+    """
+    n = len(family)
+    prior = pedigree.prior()
+    inheritance = pedigree.inheritance()
+
+    # Per person, the factor of each gene count given the parents' genes
+    factors = []
+    for i in range(n):
+        evidence = family.evidence[i]
+        if family.mothers[i] < 0:
+            factors.append((prior * evidence).tolist())
+        else:
+            factors.append((inheritance * evidence[:, None, None]).tolist())
+    mothers = family.mothers.tolist()
+    fathers = family.fathers.tolist()
+    genes = [0] * n
+    totals = [[0.0] * len(pedigree.GENES) for _ in range(n)]
+
+    def assign(i, product):
+        """
+        Returns the total probability of every completion of the
+        assignment of people before `i`, whose product is `product`,
+        adding each person's share to `totals`.
+        """
+        if i == n:
+            return product
+        if mothers[i] < 0:
+            weights = factors[i]
+        else:
+            weights = [row[genes[mothers[i]]][genes[fathers[i]]] for row in factors[i]]
+        total = 0.0
+        for g, weight in enumerate(weights):
+            if weight == 0:
+                continue
+            genes[i] = g
+            mass = assign(i + 1, product * weight)
+            totals[i][g] += mass
+            total += mass
+        return total
+
+    assign(0, 1.0)
+    totals = np.array(totals)
+    return totals / totals.sum(axis=1, keepdims=True)
+
+
+def probabilities(people):
+    """
+    Return the `heredity.main` probabilities dictionary of every person
+    in `people` by pruned enumeration of gene assignments.
+    """
+    family = pedigree.Family(people)
+    return family.probabilities(gene_marginals(family))
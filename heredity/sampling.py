@@ -0,0 +1,214 @@
+import math
+import time
+
+import numpy as np
+
+import pedigree
+
+
+def likelihood_weighting(family, samples=100000, batch=10000, seed=None, budget=None):
+    """
+    Returns estimated gene marginals of a `pedigree.Family`, their
+    standard errors (both n x 3 arrays) and a report dictionary.
+
+    Each batch draws up to `batch` gene assignments at once, person by
+    person in topological order from their parents' genes, and weighs
+    each by the likelihood of the known traits. Sampling stops after
+    `samples` assignments or once `budget` seconds have passed; with a
+    budget, the first batch is small and later ones are sized from the
+    measured rate to fit the time left. Weights are kept
+    as logarithms relative to the largest seen so far, so large families
+    do not underflow. The standard error is that of a self-normalized
+    importance sampling estimate, and the report includes the effective
+    sample size (sum of weights squared over sum of squared weights).
+    """
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+    rng = np.random.default_rng(seed)
+    n = len(family)
+    prior = pedigree.prior()
+    inheritance = pedigree.inheritance()
+    with np.errstate(divide="ignore"):
+        log_evidence = np.log(family.evidence)
+
+    # Weighted counts of each gene count, and with squared weights
+    totals = np.zeros((n, len(pedigree.GENES)))
+    squares = np.zeros((n, len(pedigree.GENES)))
+    weight = square = 0.0
+    shift = -np.inf
+    drawn = 0
+    start = time.perf_counter()
+    size = batch if budget is None else min(batch, 100)
+    while drawn < samples:
+        size = min(size, samples - drawn)
+        genes = np.empty((n, size), dtype=np.int64)
+        log_weights = np.zeros(size)
+        for i in range(n):
+            if family.mothers[i] < 0:
+                genes[i] = draw(rng, np.broadcast_to(prior, (size, 3)))
+            else:
+                genes[i] = draw(rng, inheritance[:, genes[family.mothers[i]],
+                                                 genes[family.fathers[i]]].T)
+            log_weights += log_evidence[i][genes[i]]
+
+        largest = log_weights.max()
+        if largest > shift:
+            scale = np.exp(shift - largest) if np.isfinite(shift) else 0.0
+            totals *= scale
+            squares *= scale ** 2
+            weight *= scale
+            square *= scale ** 2
+            shift = largest
+        weights = np.exp(log_weights - shift)
+        for i in range(n):
+            totals[i] += np.bincount(genes[i], weights=weights, minlength=3)
+            squares[i] += np.bincount(genes[i], weights=weights ** 2, minlength=3)
+        weight += weights.sum()
+        square += (weights ** 2).sum()
+        drawn += size
+        if budget is not None:
+            elapsed = time.perf_counter() - start
+            if elapsed > budget:
+                break
+            # Size the next batch to use about half of the time left
+            rate = drawn / max(elapsed, 1e-9)
+            size = int(min(batch, max(1, rate * (budget - elapsed) / 2)))
+
+    genes = totals / weight
+    errors = np.sqrt(np.maximum(
+        squares - 2 * genes * squares + genes ** 2 * square, 0
+    )) / weight
+    return genes, errors, {
+        "samples": drawn,
+        "seconds": time.perf_counter() - start,
+        "effective": weight ** 2 / square,
+    }
+
+
+def gibbs(family, samples=100000, chains=1000, burn_in=100, seed=None, budget=None):
+    """
+    Returns estimated gene marginals of a `pedigree.Family`, their
+    standard errors (both n x 3 arrays) and a report dictionary.
+
+    `chains` Gibbs chains start from forward samples and run in step:
+    every sweep resamples each person in turn, in all chains at once,
+    from their genes' distribution given their parents, their children
+    and their children's other parents. After `burn_in` sweeps, each
+    chain averages those conditional distributions rather than the
+    sampled genes. Sweeps stop once `samples` (chains x sweeps) have
+    been averaged or `budget` seconds have passed, and the standard
+    error is that of the mean of the independent chains. The budget is
+    checked after every person during burn-in and after every sweep
+    afterwards, and ValueError is raised if it runs out before any
+    sweep is averaged.
+    """
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    n = len(family)
+    prior = pedigree.prior()
+    inheritance = pedigree.inheritance()
+    mothers = family.mothers.tolist()
+    fathers = family.fathers.tolist()
+    mother_of = [[] for _ in range(n)]
+    father_of = [[] for _ in range(n)]
+    for c in range(n):
+        if mothers[c] >= 0:
+            mother_of[mothers[c]].append(c)
+            father_of[fathers[c]].append(c)
+
+    genes = np.empty((n, chains), dtype=np.int64)
+    for i in range(n):
+        if mothers[i] < 0:
+            genes[i] = draw(rng, np.broadcast_to(prior, (chains, 3)))
+        else:
+            genes[i] = draw(rng, inheritance[:, genes[mothers[i]], genes[fathers[i]]].T)
+
+    totals = np.zeros((n, chains, len(pedigree.GENES)))
+    squares = np.zeros_like(totals)
+    sweeps = 0
+    for sweep in range(burn_in + math.ceil(samples / chains)):
+        for i in range(n):
+            if (sweep < burn_in and budget is not None
+                    and time.perf_counter() - start > budget):
+                raise ValueError(f"the time budget of {budget}s ran out during burn-in")
+            if mothers[i] < 0:
+                weights = np.tile(prior * family.evidence[i], (chains, 1))
+            else:
+                weights = (inheritance[:, genes[mothers[i]], genes[fathers[i]]].T
+                           * family.evidence[i])
+            for c in mother_of[i]:
+                weights *= inheritance[genes[c], :, genes[fathers[c]]]
+            for c in father_of[i]:
+                weights *= inheritance[genes[c], genes[mothers[c]], :]
+            weights /= weights.sum(axis=1, keepdims=True)
+            if sweep >= burn_in:
+                totals[i] += weights
+                squares[i] += weights ** 2
+            genes[i] = draw(rng, weights)
+        if sweep >= burn_in:
+            sweeps += 1
+        if budget is not None and time.perf_counter() - start > budget:
+            break
+
+    if sweeps == 0:
+        raise ValueError(f"the time budget of {budget}s ran out during burn-in")
+    means = totals / sweeps
+    if chains > 1:
+        errors = means.std(axis=1, ddof=1) / np.sqrt(chains)
+    else:
+        errors = np.full((n, len(pedigree.GENES)), np.nan)
+    return means.mean(axis=1), errors, {
+        "samples": sweeps * chains,
+        "seconds": time.perf_counter() - start,
+        "rhat": potential_scale_reduction(means, squares / sweeps, sweeps),
+    }
+
+
+def potential_scale_reduction(means, squares, sweeps):
+    """
+    Returns the largest Gelman-Rubin potential scale reduction of any
+    gene probability, from each chain's (n x chains x 3) `means` and
+    mean `squares` over `sweeps` sweeps. Values well above 1 mean the
+    chains have not mixed, and a longer burn-in or more sweeps per
+    chain is needed before their averages can be trusted.
+    """
+    chains = means.shape[1]
+    if chains < 2 or sweeps < 2:
+        return float("nan")
+    within = ((squares - means ** 2) * sweeps / (sweeps - 1)).mean(axis=1)
+    between = means.var(axis=1, ddof=1) * sweeps
+    pooled = (sweeps - 1) / sweeps * within + between / sweeps
+    varying = within > 1e-12
+    if not varying.any():
+        return 1.0
+    return float(np.sqrt(pooled[varying] / within[varying]).max())
+
+
+def draw(rng, probabilities):
+    """
+    Returns one gene count per row of an (m x 3) array of probabilities.
+    """
+    cumulative = np.cumsum(probabilities, axis=1)
+    u = rng.random(len(cumulative)) * cumulative[:, -1]
+    return np.minimum((u[:, None] >= cumulative).sum(axis=1), 2)
+
+
+SAMPLERS = {
+    "likelihood": likelihood_weighting,
+    "gibbs": gibbs,
+}
+
+
+def probabilities(people, sampler="likelihood", **options):
+    """
+    Return the `heredity.main` probabilities dictionary of every person
+    in `people` estimated by `sampler`, along with its report: the
+    number of samples, the seconds taken and the largest standard error
+    of any gene probability, as "error".
+    """
+    family = pedigree.Family(people)
+    genes, errors, report = SAMPLERS[sampler](family, **options)
+    report["error"] = float(errors.max()) if errors.size else 0.0
+    return family.probabilities(genes), report
@@ -0,0 +1,132 @@
+import pytest
+
+import elimination
+import junction
+import pedigree
+import pruned
+import sampling
+import vectorized
+from heredity import enumerate_probabilities, load_data
+
+
+def person(name, mother=None, father=None, trait=None):
+    return name, {"name": name, "mother": mother, "father": father, "trait": trait}
+
+
+family0 = dict([
+    person("Harry", "Lily", "James"),
+    person("James", trait=True),
+    person("Lily", trait=False),
+])
+
+# Ivy's parents are siblings, so her genes come from Ann and Bob two ways
+siblings = dict([
+    person("Ann", trait=True),
+    person("Bob"),
+    person("Cat", "Ann", "Bob"),
+    person("Dan", "Ann", "Bob", trait=False),
+    person("Ivy", "Cat", "Dan", trait=True),
+])
+
+families = [family0, siblings, pedigree.layered_family(2, seed=6)] + [
+    pedigree.random_family(size, seed) for size, seed in ((4, 1), (6, 2), (7, 3))
+]
+
+
+def assert_same(probabilities, expected, tolerance=1e-9):
+    assert probabilities.keys() == expected.keys()
+    for name in expected:
+        for field in ("gene", "trait"):
+            for value, p in expected[name][field].items():
+                assert probabilities[name][field][value] == pytest.approx(p, abs=tolerance)
+
+
+def test_load_data(tmp_path):
+    path = tmp_path / "family0.csv"
+    path.write_text("name,mother,father,trait\nHarry,Lily,James,\nJames,,,1\nLily,,,0\n")
+    assert load_data(path) == family0
+
+
+def test_enumeration_matches_known_values():
+    harry = enumerate_probabilities(family0)["Harry"]
+    assert harry["gene"][2] == pytest.approx(0.0092, abs=1e-4)
+    assert harry["gene"][1] == pytest.approx(0.4557, abs=1e-4)
+    assert harry["gene"][0] == pytest.approx(0.5351, abs=1e-4)
+    assert harry["trait"][True] == pytest.approx(0.2665, abs=1e-4)
+
+
+@pytest.mark.parametrize("method", [
+    elimination.probabilities, junction.probabilities, pruned.probabilities,
+    vectorized.probabilities
+])
+@pytest.mark.parametrize("people", families)
+def test_methods_match_enumeration(method, people):
+    assert_same(method(people), enumerate_probabilities(people))
+
+
+def test_elimination_scales_to_large_families():
+    people = pedigree.random_family(200, seed=4)
+    probabilities = elimination.probabilities(people)
+    assert probabilities.keys() == people.keys()
+    for name in people:
+        assert sum(probabilities[name]["gene"].values()) == pytest.approx(1)
+        assert sum(probabilities[name]["trait"].values()) == pytest.approx(1)
+
+
+def test_family_rejects_invalid_parents():
+    with pytest.raises(ValueError):
+        pedigree.Family(dict([person("A", "B", None)]))
+    with pytest.raises(ValueError):
+        pedigree.Family(dict([person("A", "B", "C")]))
+    with pytest.raises(ValueError):
+        pedigree.Family(dict([person("A", "B", "B"), person("B", "A", "A")]))
+
+
+def test_vectorized_chunks_agree():
+    people = pedigree.random_family(6, seed=5)
+    assert_same(vectorized.probabilities(people, chunk_size=7),
+                vectorized.probabilities(people))
+
+
+def test_junction_tree_handles_deep_pedigrees_with_loops():
+    family = pedigree.Family(pedigree.layered_family(40, seed=7))
+    tree = junction.JunctionTree(family)
+    assert tree.width() <= 8
+    genes = tree.gene_marginals()
+    assert genes == pytest.approx(elimination.gene_marginals(family), abs=1e-9)
+
+
+@pytest.mark.parametrize("sampler", sampling.SAMPLERS)
+@pytest.mark.parametrize("people", [family0, siblings, pedigree.layered_family(3, seed=8)])
+def test_samplers_estimate_exact_marginals(sampler, people):
+    probabilities, report = sampling.probabilities(people, sampler, samples=40000, seed=1)
+    assert report["samples"] == 40000
+    assert 0 < report["error"] < 0.02
+    assert_same(probabilities, junction.probabilities(people), tolerance=5 * report["error"])
+
+
+@pytest.mark.parametrize("sampler", sampling.SAMPLERS)
+def test_samplers_are_seeded_and_respect_the_budget(sampler):
+    people = pedigree.random_family(30, seed=9)
+    first, _ = sampling.probabilities(people, sampler, samples=5000, seed=2)
+    second, _ = sampling.probabilities(people, sampler, samples=5000, seed=2)
+    assert first == second
+    # A short burn-in lets Gibbs sampling finish it well within the smaller budget
+    options = {"burn_in": 10} if sampler == "gibbs" else {}
+    counts = [
+        sampling.probabilities(people, sampler, samples=10 ** 9, seed=2, budget=budget,
+                               **options)[1]["samples"]
+        for budget in (0.1, 1)
+    ]
+    assert 0 < counts[0] < counts[1] < 10 ** 9
+
+
+def test_budget_bounds_large_families_and_burn_in():
+    family = pedigree.Family(pedigree.layered_family(200, seed=10))
+    _, _, report = sampling.likelihood_weighting(family, samples=10 ** 9, budget=0.2, seed=3)
+    assert 0 < report["samples"] < 10 ** 9
+    with pytest.raises(ValueError, match="burn-in"):
+        sampling.gibbs(family, samples=10 ** 9, budget=0.05, seed=3)
+    for sampler in sampling.SAMPLERS.values():
+        with pytest.raises(ValueError, match="samples"):
+            sampler(family, samples=0)
@@ -0,0 +1,87 @@
+import itertools
+
+import numpy as np
+
+import heredity
+import pedigree
+
+
+def gene_marginals(family, chunk_size=1 << 16):
+    """
+    Returns the (n x 3) array of every person's unnormalized gene
+    distribution given the known traits, summed over all 3^n gene
+    assignments at most `chunk_size` at a time.
+
+    Every person's factor is one lookup in their table of probabilities
+    by (own, mother's, father's) genes, times the likelihood of their
+    known trait; unknown traits sum out. The first L people in
+    topological order, with 3^L <= `chunk_size`, are enumerated once as
+    an array of assignments, along with the product of their factors,
+    which only depend on each other. Each chunk is those assignments
+    with the remaining people's genes fixed, so it only looks up the
+    factors of the remaining people.
+    """
+    n = len(family)
+    inheritance = pedigree.inheritance()
+    prior = pedigree.prior()
+
+    # Founders' tables ignore the (absent) parents' genes
+    tables = np.empty((n, 3, 3, 3))
+    for i in range(n):
+        if family.mothers[i] < 0:
+            tables[i] = prior[:, None, None]
+        else:
+            tables[i] = inheritance
+        tables[i] *= family.evidence[i][:, None, None]
+    tables = tables.reshape(n, -1)
+    mothers = family.mothers.tolist()
+    fathers = family.fathers.tolist()
+
+    low = 0
+    while low < n and 3 ** (low + 1) <= chunk_size:
+        low += 1
+    powers = 3 ** np.arange(low, dtype=np.int64)
+    genes = np.arange(3 ** low, dtype=np.int64)[:, None] // powers % 3
+
+    # Table offsets of each person's factor from the first `low` people
+    offsets = []
+    for i in range(n):
+        offset = np.zeros(len(genes), dtype=np.int64)
+        if i < low:
+            offset += genes[:, i] * 9
+        if 0 <= mothers[i] < low:
+            offset += genes[:, mothers[i]] * 3
+        if 0 <= fathers[i] < low:
+            offset += genes[:, fathers[i]]
+        offsets.append(offset)
+    base = np.ones(len(genes))
+    for i in range(low):
+        base *= tables[i][offsets[i]]
+
+    weights = np.zeros(len(genes))
+    totals = np.zeros((n, len(pedigree.GENES)))
+    for high in itertools.product(pedigree.GENES, repeat=n - low):
+        assigned = dict(zip(range(low, n), high))
+        p = base.copy()
+        for i in range(low, n):
+            offset = assigned[i] * 9
+            offset += assigned.get(mothers[i], 0) * 3 + assigned.get(fathers[i], 0)
+            p *= tables[i][offsets[i] + offset]
+        weights += p
+        mass = p.sum()
+        for i, g in assigned.items():
+            totals[i, g] += mass
+    for i in range(low):
+        totals[i] = np.bincount(genes[:, i], weights=weights, minlength=3)
+    return totals
+
+
+def probabilities(people, chunk_size=1 << 16):
+    """
+    Return the `heredity.main` probabilities dictionary of every person
+    in `people` by vectorized enumeration of gene assignments.
+    """
+    family = pedigree.Family(people)
+    probabilities = family.probabilities(gene_marginals(family, chunk_size))
+    heredity.normalize(probabilities)
+    return probabilities
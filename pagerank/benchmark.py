@@ -0,0 +1,247 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import crawler
+import incremental
+import matrix
+import parallel
+import sampler
+import pagerank
+import synthetic
+from pagerank import DAMPING, SAMPLES, crawl
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PageRank engines.")
+    parser.add_argument("--pages", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("sample", help="vectorized sampler throughput")
+    command.add_argument("--samples", type=int, default=10000000)
+    command.add_argument("--walkers", type=int, default=100000)
+    command.set_defaults(run=benchmark_sample)
+
+    command = commands.add_parser("crawl", help="crawler throughput on HTML files")
+    command.add_argument("--workers", type=int, default=os.cpu_count())
+    command.set_defaults(run=benchmark_crawl)
+
+    command = commands.add_parser("incremental", help="warm vs. cold start iterations")
+    command.add_argument("--changes", type=int, default=20,
+                         help="pages whose links are rewired, plus as many new pages")
+    command.set_defaults(run=benchmark_incremental)
+
+    command = commands.add_parser("solvers", help="iterations of each solver")
+    command.add_argument("--tolerance", type=float, default=1e-8)
+    command.set_defaults(run=benchmark_solvers)
+
+    command = commands.add_parser("personalized", help="batched vs. sequential solves")
+    command.add_argument("--vectors", type=int, default=64)
+    command.add_argument("--seeds", type=int, default=10, help="pages per seed set")
+    command.set_defaults(run=benchmark_personalized)
+
+    command = commands.add_parser("parallel", help="scaling from 1 to N processes")
+    command.add_argument("--workers", type=int, default=os.cpu_count())
+    command.set_defaults(run=benchmark_parallel)
+
+    command = commands.add_parser(
+        "suite", help="time crawl, sampling and iteration and check they agree"
+    )
+    command.add_argument("--dangling", type=float, default=0.1)
+    command.add_argument("--samples", type=int, default=10000000)
+    command.add_argument("--tolerance", type=float, default=0.01,
+                         help="largest allowed difference of sampled and iterated ranks")
+    command.add_argument("--reference-pages", type=int, default=2000,
+                         help="largest corpus also run through the original functions")
+    command.set_defaults(run=benchmark_suite)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+def build_graph(args):
+    start = time.perf_counter()
+    sources, targets = synthetic.powerlaw_edges(args.pages, seed=args.seed)
+    graph = matrix.LinkGraph(
+        [f"{i}.html" for i in range(args.pages)], sources, targets
+    )
+    print(f"Generated {args.pages} pages and {len(sources)} links "
+          f"in {time.perf_counter() - start:.2f}s.")
+    return graph
+
+
+def benchmark_sample(args):
+    graph = build_graph(args)
+    expected = matrix.power_iteration(graph, DAMPING)
+    start = time.perf_counter()
+    ranks = sampler.sample(
+        graph, DAMPING, args.samples, args.walkers,
+        rng=np.random.default_rng(args.seed)
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Sampled {args.samples} pages with {args.walkers} walkers in "
+          f"{elapsed:.2f}s ({args.samples / elapsed / 1e6:.2f}M samples/s).")
+    print(f"Largest deviation from power iteration: {np.abs(ranks - expected).max():.2e}")
+
+
+def benchmark_crawl(args):
+    corpus = synthetic.powerlaw_corpus(args.pages, seed=args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic.write_corpus(corpus, directory)
+        print(f"Wrote {args.pages} HTML pages.")
+        baseline = timed("crawl", args.pages, crawl, directory)
+        candidate = timed(
+            f"crawler ({args.workers} workers)", args.pages,
+            crawler.crawl, directory, args.workers
+        )
+    if baseline != candidate:
+        raise SystemExit("Crawlers disagree.")
+
+
+def benchmark_incremental(args):
+    rng = np.random.default_rng(args.seed)
+    sources, targets = synthetic.powerlaw_edges(args.pages, seed=args.seed)
+    pages = [f"{i:07d}.html" for i in range(args.pages)]
+    previous = incremental.State(pages, sources, targets)
+    previous.ranks = matrix.power_iteration(previous.graph(), DAMPING)
+
+    # Rewire the links of a few pages and add as many new pages
+    rewired = rng.choice(args.pages, size=args.changes, replace=False)
+    keep = ~np.isin(sources, rewired)
+    total = args.pages + args.changes
+    new_sources = np.concatenate([
+        sources[keep],
+        np.repeat(rewired, 5),
+        np.repeat(np.arange(args.pages, total), 5),
+    ])
+    new_targets = np.concatenate([
+        targets[keep], rng.integers(total, size=10 * args.changes)
+    ])
+    valid = new_sources != new_targets
+    edges = np.unique(new_sources[valid] * total + new_targets[valid])
+    current = incremental.State(
+        pages + [f"{i:07d}.html" for i in range(args.pages, total)],
+        edges // total, edges % total
+    )
+
+    history = []
+    expected = matrix.power_iteration(current.graph(), DAMPING, history=history)
+    print(f"Cold start: {len(history)} iterations.")
+    for local in (False, True):
+        stats = incremental.update(previous, current, DAMPING, local=local)
+        label = "Warm start with local propagation" if local else "Warm start"
+        print(f"{label}: {stats['local']} local + {stats['iterations']} global "
+              f"iterations for {stats['changed']} changed pages, largest "
+              f"difference {np.abs(current.ranks - expected).max():.1e}.")
+
+
+def benchmark_solvers(args):
+    graph = build_graph(args)
+    expected = matrix.solve(graph, DAMPING, tolerance=1e-14, stopping="l1")
+    for solver in matrix.SOLVERS:
+        history = []
+        start = time.perf_counter()
+        ranks = matrix.solve(
+            graph, DAMPING, solver, args.tolerance, "l1", history=history
+        )
+        print(f"{solver}: {len(history)} iterations in "
+              f"{time.perf_counter() - start:.2f}s, "
+              f"L1 error {np.abs(ranks - expected).sum():.1e}")
+
+
+def benchmark_personalized(args):
+    graph = build_graph(args)
+    rng = np.random.default_rng(args.seed)
+    teleport = np.zeros((len(graph), args.vectors))
+    for column in range(args.vectors):
+        teleport[rng.choice(len(graph), args.seeds, replace=False), column] = 1
+
+    start = time.perf_counter()
+    sequential = np.column_stack([
+        matrix.personalized(graph, DAMPING, teleport[:, [column]])
+        for column in range(args.vectors)
+    ])
+    sequential_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = matrix.personalized(graph, DAMPING, teleport)
+    batched_time = time.perf_counter() - start
+    print(f"{args.vectors} teleport vectors: sequential {sequential_time:.2f}s, "
+          f"batched {batched_time:.2f}s, speedup {sequential_time / batched_time:.1f}x, "
+          f"largest difference {np.abs(batched - sequential).max():.1e}")
+
+
+def benchmark_parallel(args):
+    graph = build_graph(args)
+    start = time.perf_counter()
+    expected = matrix.power_iteration(graph, DAMPING)
+    serial = time.perf_counter() - start
+    print(f"serial: {serial:.2f}s")
+    for workers in range(1, args.workers + 1):
+        start = time.perf_counter()
+        ranks = parallel.iterate_pagerank(graph, DAMPING, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers} workers: {elapsed:.2f}s, speedup {serial / elapsed:.2f}x, "
+              f"largest difference {np.abs(ranks - expected).max():.1e}")
+
+
+def benchmark_suite(args):
+    corpus = synthetic.powerlaw_corpus(args.pages, dangling=args.dangling, seed=args.seed)
+    links = sum(len(links) for links in corpus.values())
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic.write_corpus(corpus, directory)
+        print(f"Wrote {args.pages} HTML pages with {links} links.")
+        crawled = timed("crawler.crawl", args.pages, crawler.crawl, directory)
+        if crawled != corpus:
+            failures.append("crawler.crawl does not reproduce the corpus")
+        if args.pages <= args.reference_pages:
+            if timed("pagerank.crawl", args.pages, crawl, directory) != corpus:
+                failures.append("pagerank.crawl does not reproduce the corpus")
+
+    engines = [(
+        timed("sampler.sample_pagerank", args.pages, sampler.sample_pagerank,
+              corpus, DAMPING, args.samples, 1000, args.seed),
+        timed("matrix.iterate_pagerank", args.pages, matrix.iterate_pagerank,
+              corpus, DAMPING),
+        "sampler.sample_pagerank vs. matrix.iterate_pagerank"
+    )]
+    if args.pages <= args.reference_pages:
+        np.random.seed(args.seed)
+        engines.append((
+            timed("pagerank.sample_pagerank", args.pages, pagerank.sample_pagerank,
+                  corpus, DAMPING, SAMPLES),
+            timed("pagerank.iterate_pagerank", args.pages, pagerank.iterate_pagerank,
+                  corpus, DAMPING),
+            "pagerank.sample_pagerank vs. pagerank.iterate_pagerank"
+        ))
+    else:
+        print(f"Skipping the original functions above {args.reference_pages} pages.")
+
+    for sampled, iterated, label in engines:
+        difference = max(abs(sampled[page] - iterated[page]) for page in corpus)
+        print(f"{label}: largest difference {difference:.1e}")
+        if difference > args.tolerance:
+            failures.append(f"{label} differ by {difference:.1e}")
+    if failures:
+        raise SystemExit("Failed: " + "; ".join(failures))
+    print("All stages agree.")
+
+
+def timed(label, pages, function, *args):
+    """
+    Calls `function(*args)`, prints its throughput in pages per second
+    and returns its result.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.2f}s ({pages / elapsed:.0f} pages/s)")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import mmap
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Same pattern as `pagerank.crawl`, matched on raw bytes
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Files at least this large are memory-mapped rather than read
+MMAP_SIZE = 1 << 20
+
+
+def crawl_edges(directory, workers=None, chunk_size=256):
+    """
+    Parse a directory of HTML pages in parallel and return the link
+    graph as an edge list: the sorted list of page names, and arrays
+    of source and target page indices for every link between two
+    different pages of the corpus.
+
+    Files are handed to a pool of `workers` processes `chunk_size` at
+    a time, and scanned as bytes without decoding the whole page.
+    """
+    pages = list_pages(directory)
+    sources = []
+    targets = []
+    for source, links in page_links(directory, pages, workers, chunk_size):
+        sources.extend([source] * len(links))
+        targets.extend(links)
+
+    # A page may link to the same page more than once
+    edges = np.unique(
+        np.array(sources, dtype=np.int64) * max(len(pages), 1)
+        + np.array(targets, dtype=np.int64)
+    )
+    return pages, edges // max(len(pages), 1), edges % max(len(pages), 1)
+
+
+def crawl_to_files(directory, output, workers=None, chunk_size=256):
+    """
+    Parse a directory of HTML pages in parallel like `crawl_edges`, but
+    stream the link graph to files in `output` instead of memory:
+
+        pages.txt     one page name per line, in sorted order
+        edges.bin     (source, target) pairs of native int32 page indices
+        out_degree.npy  the number of links on each page
+
+    Returns the number of pages and of links written.
+    """
+    pages = list_pages(directory)
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, "pages.txt"), "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(page + "\n")
+
+    out_degree = np.zeros(len(pages), dtype=np.int64)
+    edges = 0
+    with open(os.path.join(output, "edges.bin"), "wb") as f:
+        buffer = array("i")
+        for source, links in page_links(directory, pages, workers, chunk_size):
+            for target in links:
+                buffer.append(source)
+                buffer.append(target)
+            out_degree[source] += len(links)
+            if len(buffer) >= 1 << 20:
+                edges += len(buffer) // 2
+                buffer.tofile(f)
+                buffer = array("i")
+        edges += len(buffer) // 2
+        buffer.tofile(f)
+    np.save(os.path.join(output, "out_degree.npy"), out_degree)
+    return len(pages), edges
+
+
+def list_pages(directory):
+    """
+    Returns the sorted names of the HTML pages in `directory`.
+    """
+    return sorted(
+        entry.name for entry in os.scandir(directory)
+        if entry.name.endswith(".html")
+    )
+
+
+def page_links(directory, pages, workers=None, chunk_size=256):
+    """
+    Yields (source, links) for every page in `pages`, in order: the
+    page's index and the indices of the other pages of the corpus it
+    links to. Pages are parsed by a pool of `workers`
+    processes `chunk_size` at a time, or in this process if `workers`
+    is 1, and the pool is shut down when the generator is closed.
+    """
+    index = {page: i for i, page in enumerate(pages)}
+    paths = [os.path.join(directory, page) for page in pages]
+    if workers == 1:
+        results = map(extract_links, paths)
+    else:
+        executor = ProcessPoolExecutor(workers)
+        results = executor.map(extract_links, paths, chunksize=chunk_size)
+    try:
+        for source, links in enumerate(results):
+            targets = [index.get(link) for link in links]
+            yield source, [
+                target for target in targets
+                if target is not None and target != source
+            ]
+    finally:
+        if workers != 1:
+            executor.shutdown()
+
+
+def crawl(directory, workers=None):
+    """
+    Parallel equivalent of `pagerank.crawl`, returning the same
+    dictionary of page -> set of linked pages.
+    """
+    pages, sources, targets = crawl_edges(directory, workers)
+    corpus = {page: set() for page in pages}
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        corpus[pages[source]].add(pages[target])
+    return corpus
+
+
+def extract_links(path):
+    """
+    Returns the set of link targets in the HTML file at `path`. Large
+    files are memory-mapped so the regex streams over the page cache
+    instead of a copy of the file.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or size < MMAP_SIZE:
+            return links_in(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            return links_in(contents)
+
+
+def links_in(contents):
+    return {
+        link.decode("utf-8", "replace") for link in LINK.findall(contents)
+    }
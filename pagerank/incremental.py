@@ -0,0 +1,190 @@
+import argparse
+import os
+
+import numpy as np
+from scipy import sparse
+
+import crawler
+import matrix
+from pagerank import DAMPING
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Update PageRank values from a previous run's state."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("state", help="file holding the previous links and ranks")
+    parser.add_argument("--local", action="store_true",
+                        help="re-propagate around changed pages before iterating")
+    args = parser.parse_args()
+
+    pages, sources, targets = crawler.crawl_edges(args.corpus)
+    current = State(pages, sources, targets)
+    previous = State.load(args.state) if os.path.exists(args.state) else None
+    if previous is None:
+        history = []
+        current.ranks = matrix.power_iteration(
+            current.graph(), DAMPING, history=history
+        )
+        print(f"No previous state, {len(history)} iterations from a uniform start.")
+    else:
+        stats = update(previous, current, DAMPING, local=args.local)
+        print(f"{stats['changed']} pages changed, {stats['local']} local and "
+              f"{stats['iterations']} global iterations from the previous ranks.")
+    current.save(args.state)
+
+    print("PageRank Results from Iteration")
+    for page, rank in sorted(current.graph().to_dict(current.ranks).items()):
+        print(f"  {page}: {rank:.4f}")
+
+
+class State():
+    """
+    The link graph of one crawl as an edge list over sorted page names,
+    with the ranks computed for it.
+    """
+
+    def __init__(self, pages, sources, targets, ranks=None):
+        self.pages = list(pages)
+        self.sources = np.asarray(sources, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.ranks = ranks
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename, allow_pickle=False) as data:
+            return cls(
+                data["pages"].tolist(), data["sources"], data["targets"],
+                data["ranks"]
+            )
+
+    def save(self, filename):
+        # Write to a temporary file first so a failed run keeps the old state
+        with open(filename + ".tmp", "wb") as f:
+            np.savez(
+                f, pages=np.array(self.pages, dtype=np.str_),
+                sources=self.sources, targets=self.targets, ranks=self.ranks
+            )
+        os.replace(filename + ".tmp", filename)
+
+    def graph(self):
+        return matrix.LinkGraph(self.pages, self.sources, self.targets)
+
+    def links(self):
+        """
+        Returns a sparse 0/1 matrix with a 1 at [source, target] per link.
+        """
+        n = len(self.pages)
+        return sparse.csr_matrix(
+            (np.ones(len(self.sources), dtype=np.int8), (self.sources, self.targets)),
+            shape=(n, n)
+        )
+
+
+def changed_pages(previous, current):
+    """
+    Returns a boolean mask over the pages of `current` marking pages
+    that are new, or whose links differ from `previous`, or that a
+    removed page used to link to.
+    """
+    old_index = {page: i for i, page in enumerate(previous.pages)}
+    mapping = np.array([old_index.get(page, -1) for page in current.pages], dtype=np.int64)
+    kept = mapping >= 0
+    changed = ~kept
+
+    # Compare link rows of pages present in both crawls, in current indices
+    new_of_old = np.full(len(previous.pages), -1, dtype=np.int64)
+    new_of_old[mapping[kept]] = np.flatnonzero(kept)
+    old_links = previous.links().tocoo()
+    survives = (new_of_old[old_links.row] >= 0) & (new_of_old[old_links.col] >= 0)
+    n = len(current.pages)
+    translated = sparse.csr_matrix(
+        (old_links.data[survives],
+         (new_of_old[old_links.row[survives]], new_of_old[old_links.col[survives]])),
+        shape=(n, n)
+    )
+    difference = abs(translated - current.links())
+    changed |= np.asarray(difference.sum(axis=1)).ravel() > 0
+
+    # Old links to pages that disappeared change the page's out-degree
+    lost = new_of_old[old_links.col] < 0
+    rows = new_of_old[old_links.row[lost]]
+    changed[rows[rows >= 0]] = True
+    return changed
+
+
+def warm_start(previous, current):
+    """
+    Returns the previous ranks carried over to the pages of `current`,
+    with 1 / N for new pages, renormalized to sum to 1.
+    """
+    old_ranks = dict(zip(previous.pages, previous.ranks.tolist()))
+    fresh = 1 / len(current.pages)
+    ranks = np.array([old_ranks.get(page, fresh) for page in current.pages])
+    return ranks / ranks.sum()
+
+
+def update(previous, current, damping_factor, tolerance=1e-8, local=False, hops=2):
+    """
+    Sets `current.ranks` starting from the ranks of `previous`.
+
+    With `local`, the pages within `hops` links downstream of a changed
+    page are first iterated on their own, holding every other rank and
+    the dangling mass fixed, so the correction spreads from the change
+    before any full iteration runs.
+
+    Returns a dictionary of statistics: the number of changed pages
+    and of local and global iterations.
+    """
+    graph = current.graph()
+    ranks = warm_start(previous, current)
+    changed = changed_pages(previous, current)
+    local_iterations = 0
+    if local and changed.any():
+        ranks, local_iterations = propagate(
+            graph, ranks, changed, damping_factor, tolerance, hops
+        )
+    history = []
+    current.ranks = matrix.power_iteration(
+        graph, damping_factor, tolerance, initial=ranks, history=history
+    )
+    return {
+        "changed": int(changed.sum()),
+        "local": local_iterations,
+        "iterations": len(history),
+    }
+
+
+def propagate(graph, ranks, changed, damping_factor, tolerance, hops, max_iterations=1000):
+    """
+    Iterates PageRank on the pages within `hops` links downstream of
+    the `changed` pages only. Returns the new ranks and the number of
+    local iterations.
+    """
+    affected = changed.copy()
+    for _ in range(hops):
+        affected |= graph.matrix @ affected.astype(np.float64) > 0
+    inside = np.flatnonzero(affected)
+    outside = np.flatnonzero(~affected)
+
+    n = len(graph)
+    local = graph.matrix[inside]
+    within = local[:, inside]
+    fixed = (damping_factor * (local[:, outside] @ ranks[outside])
+             + (damping_factor * ranks[graph.dangling].sum() + 1 - damping_factor) / n)
+    ranks = ranks.copy()
+    values = ranks[inside]
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        new_values = damping_factor * (within @ values) + fixed
+        change = np.abs(new_values - values).max()
+        values = new_values
+        if change < tolerance:
+            break
+    ranks[inside] = values
+    return ranks / ranks.sum(), iterations
+
+
+if __name__ == "__main__":
+    main()
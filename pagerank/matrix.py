@@ -0,0 +1,312 @@
+import numpy as np
+from scipy import sparse
+
+
+class LinkGraph():
+    """
+    A corpus compiled to integer page indices and a sparse
+    column-stochastic link matrix.
+
+    `matrix[j, i]` is 1 / (number of links on page i) when page i links
+    to page j, so `matrix @ ranks` spreads every page's rank evenly over
+    its links. Columns of dangling pages (no links) are all zero; their
+    rank is spread over every page by a rank-one correction instead of
+    storing a dense column.
+    """
+
+    def __init__(self, pages, sources, targets):
+        self.pages = pages
+        n = len(pages)
+        out_degree = np.bincount(sources, minlength=n)
+        self.dangling = out_degree == 0
+        weights = 1 / out_degree[sources]
+        self.matrix = sparse.csr_matrix((weights, (targets, sources)), shape=(n, n))
+
+        # Links of page i are out_links[out_indptr[i]:out_indptr[i + 1]]
+        by_source = self.matrix.tocsc()
+        self.out_indptr = by_source.indptr
+        self.out_links = by_source.indices
+        self.out_degree = out_degree
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build a link graph from a `crawl` dictionary of page -> linked pages.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources = []
+        targets = []
+        for page in pages:
+            for link in corpus[page]:
+                sources.append(index[page])
+                targets.append(index[link])
+        return cls(
+            pages,
+            np.array(sources, dtype=np.int64),
+            np.array(targets, dtype=np.int64)
+        )
+
+    def __len__(self):
+        return len(self.pages)
+
+    def step(self, ranks, damping_factor):
+        """
+        Returns the ranks after one PageRank update of `ranks`.
+        """
+        n = len(self.pages)
+        dangling = ranks[self.dangling].sum()
+        return (damping_factor * (self.matrix @ ranks)
+                + (damping_factor * dangling + 1 - damping_factor) / n)
+
+    def block_step(self, blocks):
+        """
+        Returns an update function performing one block Gauss-Seidel
+        sweep over `blocks` contiguous blocks of pages: each block is
+        updated from the newest ranks of every other block, including
+        the dangling mass. The sweep does not preserve the total rank,
+        so the result is rescaled to sum to 1.
+        """
+        n = len(self.pages)
+        bounds = np.linspace(0, n, min(blocks, max(n, 1)) + 1).astype(np.int64)
+        rows = [(lo, hi, self.matrix[lo:hi]) for lo, hi in zip(bounds, bounds[1:])]
+
+        def step(ranks, damping_factor):
+            ranks = ranks.copy()
+            dangling = ranks[self.dangling].sum()
+            for lo, hi, block in rows:
+                new = (damping_factor * (block @ ranks)
+                       + (damping_factor * dangling + 1 - damping_factor) / n)
+                dangling += (new - ranks[lo:hi])[self.dangling[lo:hi]].sum()
+                ranks[lo:hi] = new
+            return ranks / ranks.sum()
+
+        return step
+
+    def to_dict(self, ranks):
+        return dict(zip(self.pages, ranks.tolist()))
+
+
+def power_iteration(graph, damping_factor, tolerance=1e-8, max_iterations=1000,
+                    initial=None, history=None):
+    """
+    Returns the PageRank vector of `graph`, repeating the update until
+    no page's rank changes by `tolerance` or more.
+
+    Iteration starts from `initial` if given, or a uniform vector. If
+    `history` is a list, the largest change of each iteration is
+    appended to it.
+    """
+    return solve(
+        graph, damping_factor, "jacobi", tolerance, "delta",
+        max_iterations, initial, history
+    )
+
+
+def solve(graph, damping_factor, solver="jacobi", tolerance=1e-8, stopping="delta",
+          max_iterations=1000, initial=None, history=None, period=10, blocks=16):
+    """
+    Returns the PageRank vector of `graph` computed by `solver`:
+
+        "jacobi"        plain power iteration
+        "gauss-seidel"  block Gauss-Seidel: pages are updated in `blocks`
+                        blocks, each block already using the new ranks
+                        of the blocks before it
+        "aitken"        power iteration with componentwise Aitken delta-
+                        squared extrapolation every `period` iterations
+        "quadratic"     power iteration with quadratic extrapolation
+                        (Kamvar et al.) every `period` iterations
+
+    Iteration stops once the change between iterates is below
+    `tolerance`, measured per `stopping` rule: "delta" is the largest
+    change of any page, as in `iterate_pagerank`, and "l1" is the L1
+    norm of the residual. If `history` is a list, that measure is
+    appended to it every iteration.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver!r}, expected one of {sorted(SOLVERS)}")
+    if stopping not in STOPPING:
+        raise ValueError(f"unknown stopping rule {stopping!r}, expected one of {sorted(STOPPING)}")
+    measure = STOPPING[stopping]
+    n = len(graph)
+    ranks = np.full(n, 1 / n) if initial is None else initial
+    if solver == "gauss-seidel":
+        update = graph.block_step(blocks)
+    else:
+        update = graph.step
+    extrapolate = EXTRAPOLATIONS.get(solver)
+    iterates = []
+
+    for iteration in range(1, max_iterations + 1):
+        new_ranks = update(ranks, damping_factor)
+        change = measure(new_ranks - ranks)
+        if history is not None:
+            history.append(change)
+        if change < tolerance:
+            return new_ranks
+        ranks = new_ranks
+
+        if extrapolate is not None:
+            iterates = (iterates + [ranks])[-4:]
+            if iteration % period == 0 and len(iterates) == 4:
+                ranks = extrapolate(iterates)
+                iterates = []
+    return ranks
+
+
+def aitken(iterates):
+    """
+    Componentwise Aitken delta-squared extrapolation of the last three
+    iterates, falling back to the last iterate where the second
+    difference vanishes.
+    """
+    x0, x1, x2 = iterates[-3:]
+    second = x2 - 2 * x1 + x0
+    safe = np.abs(second) > 1e-15
+    extrapolated = x2.copy()
+    extrapolated[safe] = x2[safe] - (x2[safe] - x1[safe]) ** 2 / second[safe]
+    return normalized(extrapolated, x2)
+
+
+def quadratic(iterates):
+    """
+    Quadratic extrapolation of the last four iterates, assuming the
+    error lies mostly along the second and third eigenvectors
+    (Kamvar, Haveliwala, Manning and Golub, 2003).
+    """
+    x0, x1, x2, x3 = iterates
+    y = np.column_stack([x1 - x0, x2 - x0])
+    gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+    gamma1, gamma2 = gamma
+    beta0 = gamma1 + gamma2 + 1
+    beta1 = gamma2 + 1
+    return normalized(beta0 * x1 + beta1 * x2 + x3, x3)
+
+
+def normalized(ranks, fallback):
+    """
+    Returns `ranks` clipped to be non-negative and scaled to sum to 1,
+    or `fallback` if that is not possible.
+    """
+    ranks = np.maximum(ranks, 0)
+    total = ranks.sum()
+    if not np.isfinite(total) or total <= 0:
+        return fallback
+    return ranks / total
+
+
+STOPPING = {
+    "delta": lambda difference: np.abs(difference).max(),
+    "l1": lambda difference: np.abs(difference).sum(),
+}
+
+EXTRAPOLATIONS = {
+    "aitken": aitken,
+    "quadratic": quadratic,
+}
+
+SOLVERS = ("jacobi", "gauss-seidel", "aitken", "quadratic")
+
+
+def personalized(graph, damping_factor, teleport, tolerance=1e-8, max_iterations=1000):
+    """
+    Returns the personalized PageRank vectors of `graph` for every
+    column of the (pages x k) `teleport` matrix, solved together.
+
+    Each column of `teleport` is a probability distribution over pages
+    that the surfer jumps to, instead of the uniform distribution; the
+    rank of pages without links is redistributed the same way. Every
+    iteration is one sparse matrix x dense matrix product over the
+    columns still changing; a column is done once none of its ranks
+    changes by `tolerance` or more.
+    """
+    teleport = np.asarray(teleport, dtype=np.float64)
+    if teleport.ndim != 2 or teleport.shape[0] != len(graph):
+        raise ValueError(f"teleport must have shape ({len(graph)}, k)")
+    totals = teleport.sum(axis=0)
+    if np.any(totals <= 0):
+        raise ValueError("every teleport vector needs a positive total")
+    teleport = teleport / totals
+
+    result = np.empty_like(teleport)
+    active = np.arange(teleport.shape[1])
+    dangling = graph.dangling.astype(np.float64)
+    links = damping_factor * graph.matrix
+    ranks = teleport.copy()
+
+    # Teleport vectors are usually sparse seed sets: add only their nonzeros
+    rows, columns = np.nonzero(teleport)
+    weights = teleport[rows, columns]
+    for _ in range(max_iterations):
+        jump = damping_factor * (dangling @ ranks) + 1 - damping_factor
+        new_ranks = links @ ranks
+        new_ranks[rows, columns] += weights * jump[columns]
+
+        # Reuse the old iterate's buffer to measure each column's change
+        ranks -= new_ranks
+        np.abs(ranks, out=ranks)
+        converged = ranks.max(axis=0) < tolerance
+        ranks = new_ranks
+
+        # Converged columns leave the batch so the rest iterate faster
+        if converged.any():
+            result[:, active[converged]] = ranks[:, converged]
+            active = active[~converged]
+            ranks = np.ascontiguousarray(ranks[:, ~converged])
+            teleport = teleport[:, ~converged]
+            rows, columns = np.nonzero(teleport)
+            weights = teleport[rows, columns]
+        if len(active) == 0:
+            break
+    result[:, active] = ranks
+    return result
+
+
+def top_k(graph, damping_factor, k, tolerance=1e-8, max_iterations=1000, history=None):
+    """
+    Returns the indices of the `k` highest ranked pages of `graph`,
+    highest first, and their ranks, stopping power iteration as soon as
+    that ordering can no longer change. The ranks are those of the last
+    iterate, so they are only accurate to within half their gaps.
+
+    Power iteration contracts the L1 error by `damping_factor` every
+    step, so the iterate is within d / (1 - d) times the L1 norm of the
+    last change from the true ranks, and since both sum to 1 no single
+    page is off by more than half of that. The ranking is final once
+    each of the top k ranks is more than twice that bound above the
+    next one. Ties never separate, so iteration also stops once no rank
+    changes by `tolerance` or more. If `history` is a list, the bound
+    is appended to it every iteration.
+    """
+    n = len(graph)
+    k = min(k, n)
+    ranks = np.full(n, 1 / n)
+    for _ in range(max_iterations):
+        new_ranks = graph.step(ranks, damping_factor)
+        difference = new_ranks - ranks
+        ranks = new_ranks
+        bound = damping_factor / (1 - damping_factor) * np.abs(difference).sum() / 2
+        if history is not None:
+            history.append(bound)
+
+        # Only the k + 1 highest ranks matter for the top k
+        candidates = np.argpartition(-ranks, min(k, n - 1))[:k + 1]
+        candidates = candidates[np.argsort(-ranks[candidates], kind="stable")]
+        gaps = -np.diff(ranks[candidates])[:k]
+        if np.all(gaps > 2 * bound) or np.abs(difference).max() < tolerance:
+            break
+    top = candidates[:k]
+    return top, ranks[top]
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=1e-8):
+    """
+    Return PageRank values for each page by power iteration on the
+    sparse link matrix of `corpus`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    return graph.to_dict(power_iteration(graph, damping_factor, tolerance))
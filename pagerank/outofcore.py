@@ -0,0 +1,112 @@
+import argparse
+import os
+
+import numpy as np
+
+import crawler
+from pagerank import DAMPING
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute PageRank over an edge list kept on disk."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("output", help="directory for the crawled edge list")
+    parser.add_argument("--block", type=int, default=1 << 22,
+                        help="number of links processed at a time")
+    parser.add_argument("--tolerance", type=float, default=1e-8)
+    args = parser.parse_args()
+
+    pages, links = crawler.crawl_to_files(args.corpus, args.output)
+    print(f"Crawled {pages} pages and {links} links into {args.output}")
+    edges = EdgeList(args.output)
+    ranks = iterate_pagerank(edges, DAMPING, args.tolerance, block=args.block)
+    print(f"PageRank Results from Iteration")
+    for page, rank in zip(edges.pages(), ranks):
+        print(f"  {page}: {rank:.4f}")
+
+
+class EdgeList():
+    """
+    A link graph written by `crawler.crawl_to_files`, with the edges
+    and out-degrees memory-mapped rather than loaded.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.out_degree = np.load(os.path.join(directory, "out_degree.npy"), mmap_mode="r")
+        path = os.path.join(directory, "edges.bin")
+        if os.path.getsize(path):
+            self.edges = np.memmap(path, dtype=np.int32, mode="r").reshape(-1, 2)
+        else:
+            self.edges = np.zeros((0, 2), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.out_degree)
+
+    def pages(self):
+        """
+        Yields the page names in index order.
+        """
+        with open(os.path.join(self.directory, "pages.txt"), encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\n")
+
+    def dangling_mass(self, ranks, block):
+        """
+        Returns the total rank of pages without links.
+        """
+        total = 0.0
+        for lo in range(0, len(self), block):
+            total += ranks[lo:lo + block][self.out_degree[lo:lo + block] == 0].sum()
+        return total
+
+    def step(self, ranks, new_ranks, damping_factor, block):
+        """
+        Writes the PageRank update of `ranks` into `new_ranks`,
+        streaming over the edges `block` at a time.
+        """
+        n = len(self)
+        new_ranks.fill((damping_factor * self.dangling_mass(ranks, block)
+                        + 1 - damping_factor) / n)
+        for lo in range(0, len(self.edges), block):
+            chunk = np.asarray(self.edges[lo:lo + block])
+            sources, targets = chunk[:, 0], chunk[:, 1]
+            shares = damping_factor * ranks[sources] / self.out_degree[sources]
+            np.add.at(new_ranks, targets, shares)
+
+
+def iterate_pagerank(edges, damping_factor, tolerance=1e-8, max_iterations=1000,
+                     block=1 << 22):
+    """
+    Return the PageRank vector of an `EdgeList`, iterating until no
+    page's rank changes by `tolerance` or more. Only the current and
+    next rank vectors are held in memory; links are streamed from disk.
+    """
+    n = len(edges)
+    ranks = np.full(n, 1 / n)
+    new_ranks = np.empty(n)
+    for _ in range(max_iterations):
+        edges.step(ranks, new_ranks, damping_factor, block)
+        ranks, new_ranks = new_ranks, ranks
+        # `new_ranks` now holds the previous iterate
+        if largest_change(ranks, new_ranks, block) < tolerance:
+            break
+    return ranks
+
+
+def largest_change(ranks, previous, block):
+    """
+    Returns the largest change of any page's rank between `previous`
+    and `ranks`, compared `block` pages at a time so no third rank
+    vector is allocated.
+    """
+    largest = 0.0
+    for lo in range(0, len(ranks), block):
+        largest = max(largest, np.abs(ranks[lo:lo + block] - previous[lo:lo + block]).max())
+    return largest
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,59 @@
+import argparse
 import os
-from numpy import random
 import re
-import sys 
+
+import numpy as np
+from numpy import random
+
+import matrix
 
 DAMPING = 0.85
 SAMPLES = 10000
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Compute PageRank for a corpus.")
+    parser.add_argument("corpus")
+    parser.add_argument(
+        "--solver", choices=matrix.SOLVERS,
+        help="iterate with this sparse-matrix solver instead of iterate_pagerank"
+    )
+    parser.add_argument("--stopping", choices=sorted(matrix.STOPPING), default="delta",
+                        help="convergence measure for --solver")
+    parser.add_argument("--tolerance", type=float, default=1e-8,
+                        help="convergence threshold for --solver")
+    parser.add_argument("--residuals", action="store_true",
+                        help="print the convergence measure of every iteration")
+    parser.add_argument("--top", type=int, metavar="K",
+                        help="only print the K highest ranked pages, by rank")
+    args = parser.parse_args()
+
+    corpus = crawl(args.corpus)
+    if args.top is not None:
+        print(f"Top {args.top} PageRank Results")
+        for page, rank in top_pagerank(corpus, DAMPING, args.top):
+            print(f"  {page}: {rank:.4f}")
+        return
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    if args.solver is None:
+        ranks = iterate_pagerank(corpus, DAMPING)
+    else:
+        graph = matrix.LinkGraph.from_corpus(corpus)
+        history = []
+        ranks = graph.to_dict(matrix.solve(
+            graph, DAMPING, args.solver, args.tolerance, args.stopping,
+            history=history
+        ))
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
+    if args.solver is not None and args.residuals:
+        print(f"Residuals ({args.stopping}) per iteration of {args.solver}")
+        for i, residual in enumerate(history, 1):
+            print(f"  {i}: {residual:.3e}")
 
 
 def crawl(directory):
@@ -128,5 +163,37 @@ def iterate_pagerank(corpus, damping_factor):
         page_ranks = new_page_ranks                   
     return page_ranks 
 
+def personalized_pagerank(corpus, damping_factor, seeds, tolerance=1e-8):
+    """
+    Return personalized PageRank values for every entry of `seeds`,
+    computed together in one batched iteration.
+
+    Each entry of `seeds` is either a set of pages, teleported to with
+    equal probability, or a dictionary mapping pages to teleport
+    weights. Return a list with one dictionary per entry, where keys
+    are page names and values their PageRank for that entry.
+    """
+    graph = matrix.LinkGraph.from_corpus(corpus)
+    index = {page: i for i, page in enumerate(graph.pages)}
+    teleport = np.zeros((len(graph), len(seeds)))
+    for column, seed in enumerate(seeds):
+        weights = seed if isinstance(seed, dict) else dict.fromkeys(seed, 1)
+        for page, weight in weights.items():
+            teleport[index[page], column] = weight
+    ranks = matrix.personalized(graph, damping_factor, teleport, tolerance)
+    return [graph.to_dict(ranks[:, column]) for column in range(len(seeds))]
+
+
+def top_pagerank(corpus, damping_factor, k):
+    """
+    Return the `k` pages of `corpus` with the highest PageRank as a
+    list of (page, rank) pairs, highest first, iterating only until
+    that ranking can no longer change.
+    """
+    graph = matrix.LinkGraph.from_corpus(corpus)
+    top, ranks = matrix.top_k(graph, damping_factor, k)
+    return [(graph.pages[i], rank) for i, rank in zip(top.tolist(), ranks.tolist())]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,159 @@
+import argparse
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+
+import matrix
+from pagerank import DAMPING, crawl
+
+# Slots of the shared control array
+CURRENT = 0
+BASE = 1
+STOP = 2
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute PageRank with a pool of processes."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--tolerance", type=float, default=1e-8)
+    args = parser.parse_args()
+
+    graph = matrix.LinkGraph.from_corpus(crawl(args.corpus))
+    ranks = graph.to_dict(
+        iterate_pagerank(graph, DAMPING, args.tolerance, workers=args.workers)
+    )
+    print(f"PageRank Results from Iteration ({args.workers} workers)")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def iterate_pagerank(graph, damping_factor, tolerance=1e-8, max_iterations=1000,
+                     workers=None, history=None):
+    """
+    Return the PageRank vector of a `matrix.LinkGraph`, iterating until
+    no page's rank changes by `tolerance` or more, like
+    `matrix.power_iteration`.
+
+    The link matrix is split into `workers` blocks of destination pages
+    with about as many links each, and every block is updated by its own
+    forked process. The current and next rank vectors live in shared
+    memory, so processes only read the ranks and write their own block;
+    a barrier separates iterations, after which the parent combines each
+    block's largest change and dangling mass.
+    """
+    n = len(graph)
+    workers = max(1, min(workers or os.cpu_count(), n))
+    bounds = partition(graph.matrix.indptr, workers)
+    context = multiprocessing.get_context("fork")
+
+    # Two rank vectors, swapped every iteration, and per-block results
+    ranks = shared(context, (2, n))
+    partials = shared(context, (workers, 2))
+    control = shared(context, 3)
+    ranks[0] = 1 / n
+    control[BASE] = (damping_factor * ranks[0][graph.dangling].sum()
+                     + 1 - damping_factor) / n
+    barrier = context.Barrier(workers + 1)
+
+    processes = [
+        context.Process(target=work, daemon=True, args=(
+            i, lo, hi, damping_factor * graph.matrix[lo:hi], graph.dangling[lo:hi],
+            ranks, partials, control, barrier
+        ))
+        for i, (lo, hi) in enumerate(zip(bounds, bounds[1:]))
+    ]
+    for process in processes:
+        process.start()
+    # Fail the barrier rather than hang if a worker dies
+    watcher = threading.Thread(target=watch, args=(processes, barrier), daemon=True)
+    watcher.start()
+
+    current = 0
+    try:
+        for _ in range(max_iterations):
+            barrier.wait()
+            barrier.wait()
+            current = 1 - current
+            change = partials[:, 0].max()
+            if history is not None:
+                history.append(change)
+            control[CURRENT] = current
+            control[BASE] = (damping_factor * partials[:, 1].sum()
+                             + 1 - damping_factor) / n
+            if change < tolerance:
+                break
+        control[STOP] = 1
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        raise RuntimeError("a PageRank worker process exited unexpectedly") from None
+    finally:
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+    return ranks[current].copy()
+
+
+def work(i, lo, hi, block, dangling, ranks, partials, control, barrier):
+    """
+    Updates pages `lo` to `hi` of the shared rank vectors once per
+    iteration until the parent sets the stop flag. `block` holds those
+    pages' rows of the link matrix, already scaled by the damping factor.
+    """
+    while True:
+        barrier.wait()
+        if control[STOP]:
+            return
+        current = int(control[CURRENT])
+        old = ranks[current, lo:hi]
+        new = ranks[1 - current, lo:hi]
+        new[:] = block @ ranks[current]
+        new += control[BASE]
+        partials[i, 0] = np.abs(new - old).max() if hi > lo else 0
+        partials[i, 1] = new[dangling].sum()
+        barrier.wait()
+
+
+def watch(processes, barrier):
+    """
+    Aborts `barrier` as soon as any of `processes` exits with an error.
+    """
+    while not barrier.broken:
+        for process in processes:
+            process.join(timeout=0.1)
+            if process.exitcode not in (None, 0):
+                barrier.abort()
+                return
+        if all(process.exitcode == 0 for process in processes):
+            return
+
+
+def partition(indptr, blocks):
+    """
+    Returns the `blocks + 1` row boundaries splitting a CSR matrix with
+    row pointer `indptr` into contiguous blocks with about the same
+    number of nonzeros each.
+    """
+    n = len(indptr) - 1
+    targets = np.linspace(0, indptr[-1], blocks + 1)
+    bounds = np.searchsorted(indptr, targets).clip(0, n)
+    bounds[0], bounds[-1] = 0, n
+    return np.maximum.accumulate(bounds)
+
+
+def shared(context, shape):
+    """
+    Returns a zeroed float64 array of `shape` backed by shared memory
+    that forked processes write to in place.
+    """
+    size = int(np.prod(shape))
+    return np.frombuffer(context.RawArray("d", size), dtype=np.float64).reshape(shape)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import numpy as np
+
+import matrix
+
+
+def sample(graph, damping_factor, n, walkers=1000, burn_in=50, rng=None):
+    """
+    Returns the fraction of `n` samples spent on each page of `graph`
+    by random surfers following the PageRank transition model.
+
+    `walkers` independent surfers move at once as NumPy arrays. Each
+    starts on a page chosen at random and takes `burn_in` unrecorded
+    steps first, so that the short chains do not over-weight their
+    uniformly chosen starting pages.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    pages = len(graph)
+    walkers = max(1, min(walkers, n))
+    positions = rng.integers(pages, size=walkers)
+    for _ in range(burn_in):
+        positions = move(graph, positions, damping_factor, rng)
+
+    counts = np.zeros(pages, dtype=np.int64)
+    remaining = n
+    while remaining > 0:
+        recorded = positions[:remaining]
+        counts += np.bincount(recorded, minlength=pages)
+        remaining -= len(recorded)
+        if remaining > 0:
+            positions = move(graph, positions, damping_factor, rng)
+    return counts / n
+
+
+def move(graph, positions, damping_factor, rng):
+    """
+    Returns the next page of every surfer: with probability
+    `damping_factor` a random link of the current page, otherwise (or
+    from a page without links) a random page of the corpus.
+    """
+    degree = graph.out_degree[positions]
+    follow = (rng.random(len(positions)) < damping_factor) & (degree > 0)
+    following = positions[follow]
+    choice = (rng.random(len(following)) * degree[follow]).astype(np.int64)
+    next_positions = rng.integers(len(graph), size=len(positions))
+    next_positions[follow] = graph.out_links[graph.out_indptr[following] + choice]
+    return next_positions
+
+
+def sample_pagerank(corpus, damping_factor, n, walkers=1000, seed=None):
+    """
+    Return PageRank values for each page by sampling `n` pages with
+    `walkers` random surfers at once. Passing a `seed` makes the
+    result reproducible.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = matrix.LinkGraph.from_corpus(corpus)
+    rng = np.random.default_rng(seed)
+    return graph.to_dict(sample(graph, damping_factor, n, walkers, rng=rng))
@@ -0,0 +1,107 @@
+import argparse
+import os
+
+import numpy as np
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a random power-law corpus of linked pages."
+    )
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--mean-links", type=float, default=8)
+    parser.add_argument("--exponent", type=float, default=2.1,
+                        help="power-law exponent of out-degrees and popularity")
+    parser.add_argument("--dangling", type=float, default=0.1,
+                        help="fraction of pages without links")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--format", choices=["html", "edges"], default="html",
+                        help="HTML pages, or an edge list as written by crawl_to_files")
+    args = parser.parse_args()
+
+    if args.format == "html":
+        corpus = powerlaw_corpus(args.pages, args.mean_links, args.exponent,
+                                 args.dangling, args.seed)
+        write_corpus(corpus, args.output)
+        links = sum(len(links) for links in corpus.values())
+    else:
+        sources, targets = powerlaw_edges(args.pages, args.mean_links, args.exponent,
+                                          args.dangling, args.seed)
+        write_edges(args.pages, sources, targets, args.output)
+        links = len(sources)
+    print(f"Wrote {args.pages} pages and {links} links to {args.output}")
+
+
+def powerlaw_corpus(pages, mean_links=8, exponent=2.1, dangling=0.1, seed=None):
+    """
+    Returns a random corpus dictionary shaped like `crawl` output, with
+    `pages` pages named "<i>.html".
+
+    Out-degrees and page popularity both follow power laws with the
+    given `exponent`, scaled to about `mean_links` links per page, and
+    a `dangling` fraction of pages has no links at all.
+    """
+    sources, targets = powerlaw_edges(pages, mean_links, exponent, dangling, seed)
+    names = [f"{i}.html" for i in range(pages)]
+    corpus = {name: set() for name in names}
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        corpus[names[source]].add(names[target])
+    return corpus
+
+
+def powerlaw_edges(pages, mean_links=8, exponent=2.1, dangling=0.1, seed=None):
+    """
+    Returns the (sources, targets) arrays of a random link graph over
+    page indices, without self-links or repeated links.
+    """
+    rng = np.random.default_rng(seed)
+    degree = rng.zipf(exponent, size=pages).astype(np.float64)
+    degree = np.minimum(np.rint(degree * mean_links / degree.mean()), pages - 1)
+    degree[rng.random(pages) < dangling] = 0
+    degree = degree.astype(np.int64)
+
+    # Targets are drawn in proportion to a power-law popularity weight
+    popularity = rng.zipf(exponent, size=pages).astype(np.float64)
+    popularity /= popularity.sum()
+    sources = np.repeat(np.arange(pages), degree)
+    targets = rng.choice(pages, size=len(sources), p=popularity)
+
+    keep = sources != targets
+    edges = np.unique(sources[keep] * pages + targets[keep])
+    return edges // pages, edges % pages
+
+
+def write_corpus(corpus, directory):
+    """
+    Writes every page of `corpus` to `directory` as an HTML file
+    linking to the pages it links to.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for page, links in corpus.items():
+        with open(os.path.join(directory, page), "w") as f:
+            f.write(f"<!DOCTYPE html>\n<html>\n<head><title>{page}</title></head>\n<body>\n")
+            f.write(f"<h1>{page}</h1>\n")
+            for link in sorted(links):
+                f.write(f'<p>See <a class="link" href="{link}">{link}</a>.</p>\n')
+            f.write("</body>\n</html>\n")
+
+
+def write_edges(pages, sources, targets, directory):
+    """
+    Writes a link graph over `pages` pages named "<i>.html" to
+    `directory` in the format of `crawler.crawl_to_files`, with pages
+    listed in index order.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "pages.txt"), "w", encoding="utf-8") as f:
+        for i in range(pages):
+            f.write(f"{i}.html\n")
+    edges = np.column_stack([sources, targets]).astype(np.int32)
+    edges.tofile(os.path.join(directory, "edges.bin"))
+    np.save(os.path.join(directory, "out_degree.npy"),
+            np.bincount(sources, minlength=pages).astype(np.int64))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import random
+
+import numpy as np
+import pytest
+
+import crawler
+import incremental
+import matrix
+import outofcore
+import parallel
+import sampler
+import synthetic
+from pagerank import (
+    DAMPING, crawl, iterate_pagerank, personalized_pagerank, top_pagerank
+)
+
+corpus0 = {
+    "1.html": {"2.html"},
+    "2.html": {"1.html", "3.html"},
+    "3.html": {"2.html", "4.html"},
+    "4.html": {"2.html"},
+}
+
+
+def random_corpus(n, seed, dangling=0.2):
+    rng = random.Random(seed)
+    pages = [f"{i}.html" for i in range(n)]
+    return {
+        page: set() if rng.random() < dangling else
+        set(rng.sample(pages, rng.randint(1, min(4, n)))) - {page}
+        for page in pages
+    }
+
+
+corpora = [corpus0, {"a.html": set(), "b.html": {"a.html"}}] + [
+    random_corpus(n, seed) for n, seed in ((5, 1), (12, 2), (30, 3))
+]
+
+
+def assert_close(ranks, expected, tolerance):
+    assert ranks.keys() == expected.keys()
+    assert sum(ranks.values()) == pytest.approx(1)
+    for page in expected:
+        assert ranks[page] == pytest.approx(expected[page], abs=tolerance)
+
+
+@pytest.mark.parametrize("corpus", corpora)
+def test_matrix_engine_matches_iterate_pagerank(corpus):
+    expected = iterate_pagerank(corpus, DAMPING)
+    assert_close(matrix.iterate_pagerank(corpus, DAMPING), expected, 0.005)
+
+
+@pytest.mark.parametrize("corpus", corpora)
+def test_vectorized_sampler_matches_iteration(corpus):
+    ranks = sampler.sample_pagerank(corpus, DAMPING, 200000, seed=1)
+    assert ranks == sampler.sample_pagerank(corpus, DAMPING, 200000, seed=1)
+    assert_close(ranks, matrix.iterate_pagerank(corpus, DAMPING), 0.01)
+
+
+def test_parallel_crawler_matches_crawl(tmp_path):
+    corpus = synthetic.powerlaw_corpus(60, seed=4)
+    synthetic.write_corpus(corpus, tmp_path)
+    (tmp_path / "notes.txt").write_text('<a href="0.html">0</a>')
+    (tmp_path / "self.html").write_text('<a href="self.html">me</a><a href="1.html">1</a>')
+    expected = crawl(tmp_path)
+    assert expected["self.html"] == {"1.html"}
+    assert crawler.crawl(tmp_path, workers=1) == expected
+    assert crawler.crawl(tmp_path, workers=2) == expected
+
+
+def state_of(corpus):
+    graph = matrix.LinkGraph.from_corpus(corpus)
+    sources, targets = graph.matrix.nonzero()
+    return incremental.State(graph.pages, targets, sources)
+
+
+def test_incremental_update_matches_cold_start(tmp_path):
+    previous = state_of(corpus0)
+    previous.ranks = matrix.power_iteration(previous.graph(), DAMPING)
+    previous.save(str(tmp_path / "state.npz"))
+    previous = incremental.State.load(str(tmp_path / "state.npz"))
+
+    corpus = dict(corpus0, **{"4.html": {"5.html"}, "5.html": {"1.html"}})
+    current = state_of(corpus)
+    changed = incremental.changed_pages(previous, current)
+    assert [page for page, c in zip(current.pages, changed) if c] == ["4.html", "5.html"]
+
+    expected = matrix.iterate_pagerank(corpus, DAMPING)
+    for local in (False, True):
+        incremental.update(previous, current, DAMPING, local=local)
+        assert_close(current.graph().to_dict(current.ranks), expected, 1e-6)
+
+
+@pytest.mark.parametrize("solver", matrix.SOLVERS)
+@pytest.mark.parametrize("corpus", corpora)
+def test_solvers_converge_to_the_same_ranks(solver, corpus):
+    graph = matrix.LinkGraph.from_corpus(corpus)
+    expected = matrix.power_iteration(graph, DAMPING, tolerance=1e-12)
+    history = []
+    ranks = matrix.solve(
+        graph, DAMPING, solver, 1e-10, "l1", history=history, period=3, blocks=3
+    )
+    assert history[-1] < 1e-10
+    assert np.abs(ranks - expected).sum() < 1e-8
+
+
+def test_out_of_core_matches_in_memory(tmp_path):
+    corpus = synthetic.powerlaw_corpus(80, dangling=0.3, seed=5)
+    synthetic.write_corpus(corpus, tmp_path / "corpus")
+    assert crawler.crawl_to_files(tmp_path / "corpus", tmp_path / "edges", workers=1) == (
+        80, sum(len(links) for links in corpus.values())
+    )
+    edges = outofcore.EdgeList(tmp_path / "edges")
+    ranks = outofcore.iterate_pagerank(edges, DAMPING, block=7)
+    expected = matrix.iterate_pagerank(corpus, DAMPING)
+    assert_close(dict(zip(edges.pages(), ranks)), expected, 1e-7)
+
+
+@pytest.mark.parametrize("corpus", corpora)
+def test_personalized_batch_matches_single_solves(corpus):
+    pages = sorted(corpus)
+    seeds = [set(pages), {pages[0]}, {pages[-1]: 3, pages[0]: 1}]
+    batched = personalized_pagerank(corpus, DAMPING, seeds, tolerance=1e-12)
+    assert_close(batched[0], matrix.iterate_pagerank(corpus, DAMPING, 1e-12), 1e-9)
+    for seed, ranks in zip(seeds, batched):
+        assert_close(ranks, personalized_pagerank(corpus, DAMPING, [seed], 1e-12)[0], 1e-9)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize("corpus", corpora)
+def test_parallel_matches_power_iteration(workers, corpus):
+    graph = matrix.LinkGraph.from_corpus(corpus)
+    ranks = parallel.iterate_pagerank(graph, DAMPING, 1e-12, workers=workers)
+    expected = matrix.iterate_pagerank(corpus, DAMPING, 1e-12)
+    assert_close(graph.to_dict(ranks), expected, 1e-9)
+
+
+def test_partition_balances_links():
+    indptr = np.array([0, 10, 10, 11, 12, 20, 21])
+    assert parallel.partition(indptr, 2).tolist() == [0, 3, 6]
+    assert parallel.partition(np.zeros(1, dtype=np.int64), 4).tolist() == [0] * 5
+
+
+def test_synthetic_edges_load_as_edge_list(tmp_path):
+    sources, targets = synthetic.powerlaw_edges(500, dangling=0.3, seed=4)
+    synthetic.write_edges(500, sources, targets, tmp_path)
+    edges = outofcore.EdgeList(tmp_path)
+    assert list(edges.pages()) == [f"{i}.html" for i in range(500)]
+    assert 0.25 < (np.asarray(edges.out_degree) == 0).mean() < 0.4
+    graph = matrix.LinkGraph(list(edges.pages()), sources, targets)
+    assert np.allclose(outofcore.iterate_pagerank(edges, DAMPING, 1e-12),
+                       matrix.power_iteration(graph, DAMPING, 1e-12))
+
+
+@pytest.mark.parametrize("corpus", corpora)
+def test_top_pagerank_matches_full_ranking(corpus):
+    expected = matrix.iterate_pagerank(corpus, DAMPING, 1e-12)
+    for k in (1, 3, len(corpus) + 1):
+        top = top_pagerank(corpus, DAMPING, k)
+        assert len(top) == min(k, len(corpus))
+        for (page, rank), (_, next_rank) in zip(top, top[1:]):
+            assert rank >= next_rank
+        for page, rank in top:
+            assert rank == pytest.approx(expected[page], abs=0.05)
+            assert sum(value > expected[page] + 1e-9 for value in expected.values()) < k
+
+
+def test_top_k_stops_before_full_convergence():
+    sources, targets = synthetic.powerlaw_edges(20000, seed=5)
+    graph = matrix.LinkGraph([f"{i}.html" for i in range(20000)], sources, targets)
+    full, bounds = [], []
+    expected = matrix.power_iteration(graph, DAMPING, 1e-12, history=full)
+    top, _ = matrix.top_k(graph, DAMPING, 5, history=bounds)
+    assert top.tolist() == np.argsort(-expected)[:5].tolist()
+    assert len(bounds) < len(full)